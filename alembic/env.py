@@ -0,0 +1,52 @@
+# alembic/env.py
+from logging.config import fileConfig
+
+from alembic import context
+
+from app.busca import INDICE
+from app.db import engine
+from app.models import Base
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def include_object(obj, name, type_, reflected, compare_to):
+    # O índice de busca (e as tabelas-sombra do FTS5: _data, _idx, ...) é
+    # mantido pela migration 0003, fora do metadata do ORM
+    if type_ == "table" and (name == INDICE or name.startswith(f"{INDICE}_")):
+        return False
+    return True
+
+
+def run_migrations_offline() -> None:
+    context.configure(
+        url=str(engine.url),
+        target_metadata=target_metadata,
+        include_object=include_object,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    with engine.connect() as connection:
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            include_object=include_object,
+            render_as_batch=connection.dialect.name == "sqlite",
+        )
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
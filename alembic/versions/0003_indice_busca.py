@@ -0,0 +1,107 @@
+"""indice busca
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+import re
+import unicodedata
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# DDL e carga congeladas nesta revisão (não importa app.busca: a migration
+# tem que criar sempre o mesmo índice, mesmo que o app mude depois)
+INDICE = 'professor_busca'
+
+
+def _normalizar(valor):
+    if not valor:
+        return ''
+    decomposto = unicodedata.normalize('NFKD', valor)
+    return ''.join(c for c in decomposto if not unicodedata.combining(c)).lower()
+
+
+def _documento(valor):
+    digitos = re.sub(r'\D', '', valor or '')
+    return f'{_normalizar(valor)} {digitos}'.strip()
+
+
+def upgrade() -> None:
+    # FTS5 (rowid = professor.id) no SQLite, tsvector + GIN no Postgres.
+    # Idempotente, para bancos adotados de create_all que já tenham o índice.
+    bind = op.get_bind()
+    postgres = bind.dialect.name == 'postgresql'
+    if postgres:
+        op.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS {INDICE} (
+                professor_id INTEGER PRIMARY KEY REFERENCES professor(id) ON DELETE CASCADE,
+                tsv TSVECTOR NOT NULL
+            )
+            """
+        )
+        op.execute(f'CREATE INDEX IF NOT EXISTS ix_{INDICE}_tsv ON {INDICE} USING GIN (tsv)')
+        inserir = sa.text(
+            f"""
+            INSERT INTO {INDICE} (professor_id, tsv) VALUES (
+                :pid,
+                setweight(to_tsvector('simple', :nome), 'A')
+                || setweight(to_tsvector('simple', :documento || ' ' || :email), 'B')
+                || setweight(to_tsvector('simple', :escola), 'C')
+                || setweight(to_tsvector('simple', :ddz), 'D')
+            )
+            """
+        )
+    else:
+        op.execute(
+            f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS {INDICE} USING fts5(
+                nome, documento, email, escola, ddz,
+                tokenize = 'unicode61 remove_diacritics 2'
+            )
+            """
+        )
+        inserir = sa.text(
+            f"""
+            INSERT INTO {INDICE} (rowid, nome, documento, email, escola, ddz)
+            VALUES (:pid, :nome, :documento, :email, :escola, :ddz)
+            """
+        )
+
+    # Construção inicial aqui, e não no boot dos workers
+    if bind.execute(sa.text(f'SELECT 1 FROM {INDICE} LIMIT 1')).first() is not None:
+        return
+    linhas = bind.execute(sa.text(
+        """
+        SELECT p.id, p.nome, p.documento, p.email, e.nome, d.nome
+        FROM professor p
+        JOIN escola e ON e.id = p.escola_id
+        JOIN ddz d ON d.id = e.ddz_id
+        """
+    )).all()
+    for i in range(0, len(linhas), 1000):
+        bind.execute(inserir, [
+            {
+                'pid': pid,
+                'nome': _normalizar(nome),
+                'documento': _documento(documento),
+                'email': _normalizar(email),
+                'escola': _normalizar(escola),
+                'ddz': _normalizar(ddz),
+            }
+            for pid, nome, documento, email, escola, ddz in linhas[i:i + 1000]
+        ])
+
+
+def downgrade() -> None:
+    op.execute(f'DROP TABLE IF EXISTS {INDICE}')
@@ -0,0 +1,280 @@
+# app/busca.py
+import re
+import unicodedata
+from typing import Iterable
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import bindparam, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from app.db import get_session
+from app.deps import pagination_params
+from app.models import DDZ, Escola, Professor, Ano, Turma, Certificacao, StatusCert
+
+router = APIRouter(prefix="/api/busca", tags=["Busca"])
+
+# Tabela auxiliar do índice: FTS5 no SQLite, tsvector + GIN no Postgres.
+# O texto é normalizado no Python (minúsculo, sem acento) para que a busca
+# seja insensível a acentos nos dois dialetos sem depender de extensões.
+# No FTS5 a chave é o próprio rowid (= professor.id): filtrar por uma coluna
+# UNINDEXED varreria a tabela virtual inteira a cada id.
+INDICE = "professor_busca"
+
+_TOKEN_RE = re.compile(r"[0-9a-z]+")
+
+
+def normalizar(valor: str | None) -> str:
+    """'João Ávila' -> 'joao avila'."""
+    if not valor:
+        return ""
+    decomposto = unicodedata.normalize("NFKD", valor)
+    return "".join(c for c in decomposto if not unicodedata.combining(c)).lower()
+
+
+def tokens(valor: str | None) -> list[str]:
+    return _TOKEN_RE.findall(normalizar(valor))
+
+
+def _documento(valor: str | None) -> str:
+    # Indexa o documento como veio e também só com dígitos ("123.456" -> "123456")
+    digitos = re.sub(r"\D", "", valor or "")
+    return f"{normalizar(valor)} {digitos}".strip()
+
+
+# ------------------------------------------------------------------------------
+# ESTRUTURA DO ÍNDICE
+# ------------------------------------------------------------------------------
+def criar_estrutura(conn: Connection) -> None:
+    """DDL do índice (idempotente). Em prod o índice vem da migration 0003, que tem a sua cópia."""
+    if conn.dialect.name == "postgresql":
+        conn.execute(text(
+            f"""
+            CREATE TABLE IF NOT EXISTS {INDICE} (
+                professor_id INTEGER PRIMARY KEY REFERENCES professor(id) ON DELETE CASCADE,
+                tsv TSVECTOR NOT NULL
+            )
+            """
+        ))
+        conn.execute(text(f"CREATE INDEX IF NOT EXISTS ix_{INDICE}_tsv ON {INDICE} USING GIN (tsv)"))
+    else:
+        conn.execute(text(
+            f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS {INDICE} USING fts5(
+                nome, documento, email, escola, ddz,
+                tokenize = 'unicode61 remove_diacritics 2'
+            )
+            """
+        ))
+
+
+def _travar_reconstrucao(db: Session) -> None:
+    # Postgres: um worker/comando por vez reconstrói (lock solto no commit).
+    # No SQLite o lock de escrita do banco já serializa.
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text("SELECT pg_advisory_xact_lock(hashtext(:k))"), {"k": INDICE})
+
+
+def popular_se_vazio(db: Session) -> int:
+    """Constrói o índice inteiro se ele estiver vazio. Não faz commit."""
+    _travar_reconstrucao(db)
+    if db.execute(text(f"SELECT 1 FROM {INDICE} LIMIT 1")).first() is not None:
+        return 0
+    return reindexar(db)
+
+
+def criar_indice(engine: Engine) -> None:
+    """Dev: cria a estrutura e popula se estiver vazio (prod usa as migrations)."""
+    with Session(engine) as db:
+        criar_estrutura(db.connection())
+        popular_se_vazio(db)
+        db.commit()
+
+
+# ------------------------------------------------------------------------------
+# SINCRONIZAÇÃO (chamada pelos handlers de CRUD e pelo importador)
+# ------------------------------------------------------------------------------
+def remover_do_indice(db: Session, professor_ids: Iterable[int]) -> None:
+    ids = list(professor_ids)
+    chave = "professor_id" if db.get_bind().dialect.name == "postgresql" else "rowid"
+    apagar = text(f"DELETE FROM {INDICE} WHERE {chave} IN :ids").bindparams(bindparam("ids", expanding=True))
+    # Lotes abaixo do limite de parâmetros do SQLite
+    for i in range(0, len(ids), 500):
+        db.execute(apagar, {"ids": ids[i:i + 500]})
+
+
+def reindexar(
+    db: Session,
+    professor_ids: Iterable[int] | None = None,
+    escola_id: int | None = None,
+    ddz_id: int | None = None,
+) -> int:
+    """
+    Regrava (upsert) as entradas do índice para os professores filtrados
+    (sem filtros, reconstrói o índice inteiro). Não faz commit.
+    """
+    q = (
+        db.query(Professor.id, Professor.nome, Professor.documento, Professor.email,
+                 Escola.nome.label("escola"), DDZ.nome.label("ddz"))
+        .join(Escola, Escola.id == Professor.escola_id)
+        .join(DDZ, DDZ.id == Escola.ddz_id)
+    )
+    if professor_ids is not None:
+        ids = list(professor_ids)
+        if not ids:
+            return 0
+        q = q.filter(Professor.id.in_(ids))
+    if escola_id is not None:
+        q = q.filter(Professor.escola_id == escola_id)
+    if ddz_id is not None:
+        q = q.filter(Escola.ddz_id == ddz_id)
+    rows = q.all()
+
+    if professor_ids is None and escola_id is None and ddz_id is None:
+        db.execute(text(f"DELETE FROM {INDICE}"))
+    if not rows:
+        return 0
+
+    params = [
+        {
+            "pid": r.id,
+            "nome": normalizar(r.nome),
+            "documento": _documento(r.documento),
+            "email": normalizar(r.email),
+            "escola": normalizar(r.escola),
+            "ddz": normalizar(r.ddz),
+        }
+        for r in rows
+    ]
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text(
+            f"""
+            INSERT INTO {INDICE} (professor_id, tsv) VALUES (
+                :pid,
+                setweight(to_tsvector('simple', :nome), 'A')
+                || setweight(to_tsvector('simple', :documento || ' ' || :email), 'B')
+                || setweight(to_tsvector('simple', :escola), 'C')
+                || setweight(to_tsvector('simple', :ddz), 'D')
+            )
+            ON CONFLICT (professor_id) DO UPDATE SET tsv = EXCLUDED.tsv
+            """
+        ), params)
+    else:
+        db.execute(text(
+            f"""
+            INSERT OR REPLACE INTO {INDICE} (rowid, nome, documento, email, escola, ddz)
+            VALUES (:pid, :nome, :documento, :email, :escola, :ddz)
+            """
+        ), params)
+    return len(rows)
+
+
+# ------------------------------------------------------------------------------
+# CONSULTA
+# ------------------------------------------------------------------------------
+def _buscar_ids(db: Session, termos: list[str], skip: int, limit: int) -> tuple[list[int], int]:
+    """Retorna (ids ordenados por relevância, total de resultados)."""
+    if db.get_bind().dialect.name == "postgresql":
+        params = {"q": " & ".join(f"{t}:*" for t in termos), "skip": skip, "limit": limit}
+        total = db.execute(text(
+            f"SELECT count(*) FROM {INDICE} WHERE tsv @@ to_tsquery('simple', :q)"
+        ), params).scalar_one()
+        ids = db.execute(text(
+            f"""
+            SELECT professor_id FROM {INDICE}
+            WHERE tsv @@ to_tsquery('simple', :q)
+            ORDER BY ts_rank(tsv, to_tsquery('simple', :q)) DESC, professor_id
+            LIMIT :limit OFFSET :skip
+            """
+        ), params).scalars().all()
+    else:
+        # Cada termo vira prefixo entre aspas ("joa"*); termos separados = AND
+        params = {"q": " ".join(f'"{t}"*' for t in termos), "skip": skip, "limit": limit}
+        total = db.execute(text(
+            f"SELECT count(*) FROM {INDICE} WHERE {INDICE} MATCH :q"
+        ), params).scalar_one()
+        ids = db.execute(text(
+            f"""
+            SELECT rowid FROM {INDICE}
+            WHERE {INDICE} MATCH :q
+            ORDER BY bm25({INDICE}, 10.0, 5.0, 5.0, 2.0, 1.0), rowid
+            LIMIT :limit OFFSET :skip
+            """
+        ), params).scalars().all()
+    return [int(i) for i in ids], int(total)
+
+
+@router.get("")
+def buscar(
+    q: str = Query(..., min_length=1, description="Nome, documento, e-mail, escola ou DDZ"),
+    pag: dict = Depends(pagination_params),
+    db: Session = Depends(get_session),
+):
+    termos = tokens(q)
+    if not termos:
+        return {"q": q, "page": pag["page"], "page_size": pag["page_size"], "total": 0, "results": []}
+
+    ids, total = _buscar_ids(db, termos, pag["skip"], pag["limit"])
+
+    # Carrega os dados da página em duas queries (professores + certificações)
+    profs = {}
+    certs: dict[int, list[dict]] = {pid: [] for pid in ids}
+    if ids:
+        for r in (
+            db.query(Professor.id, Professor.nome, Professor.documento, Professor.email,
+                     Escola.nome.label("escola"), DDZ.nome.label("ddz"))
+            .join(Escola, Escola.id == Professor.escola_id)
+            .join(DDZ, DDZ.id == Escola.ddz_id)
+            .filter(Professor.id.in_(ids))
+        ):
+            profs[r.id] = r
+        for r in (
+            db.query(Certificacao.professor_id, Certificacao.id, Certificacao.status,
+                     Certificacao.certificado_arquivo, Turma.numero, Ano.valor)
+            .join(Turma, Turma.id == Certificacao.turma_id)
+            .join(Ano, Ano.id == Turma.ano_id)
+            .filter(Certificacao.professor_id.in_(ids))
+            .order_by(Ano.valor, Turma.numero)
+        ):
+            certs[r.professor_id].append({
+                "cert_id": r.id,
+                "turma": f"{r.numero}/{r.valor}",
+                "status": getattr(r.status, "value", r.status),
+                "has_cert": bool(r.certificado_arquivo),
+            })
+
+    results = []
+    for pid in ids:
+        p = profs.get(pid)
+        if p is None:  # entrada órfã no índice
+            continue
+        lista = certs[pid]
+        if any(c["status"] == StatusCert.CERTIFICADO.value for c in lista):
+            situacao = StatusCert.CERTIFICADO.value
+        elif lista:
+            situacao = StatusCert.NAO_CERTIFICADO.value
+        else:
+            situacao = None
+        results.append({
+            "id": p.id,
+            "nome": p.nome,
+            "documento": p.documento,
+            "email": p.email,
+            "escola": p.escola,
+            "ddz": p.ddz,
+            "status": situacao,
+            "certificacoes": lista,
+        })
+
+    return {"q": q, "page": pag["page"], "page_size": pag["page_size"], "total": total, "results": results}
+
+
+if __name__ == "__main__":
+    # Reconstrução completa sob demanda: python -m app.busca
+    from app.db import SessionLocal
+
+    with SessionLocal() as db:
+        _travar_reconstrucao(db)
+        total = reindexar(db)
+        db.commit()
+    print(f"{total} professores indexados")
@@ -1,19 +1,35 @@
 # app/certificados.py
-import os
-import uuid
-import shutil
+import logging
 from typing import Literal
 
 from fastapi import APIRouter, UploadFile, File, Form, Depends
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 
 from app.db import get_session
 from app.models import Certificacao, StatusCert
+from app.storage import chave_da_certificacao, gerar_chave, get_storage
 
 router = APIRouter(prefix="/certificados", tags=["Certificados"])
+logger = logging.getLogger("app.certificados")
 
-STORAGE_ROOT = os.getenv("CERTS_DIR", "storage/certificados")
+
+def _remover_arquivo(valor: str) -> None:
+    try:
+        get_storage().remover(valor)
+    except Exception:
+        # Fica órfão no storage; `python -m app.reconciliacao` recolhe depois
+        logger.warning("Não foi possível remover %s", valor, exc_info=True)
+
+
+def _vincular_arquivo(db: Session, c: Certificacao, chave: str) -> None:
+    antigo = c.certificado_arquivo
+    c.certificado_arquivo = chave
+    c.status = StatusCert.CERTIFICADO
+    db.commit()
+    # Apaga antigo só depois do commit (se o commit falhar, o antigo continua válido)
+    if antigo and antigo != chave:
+        _remover_arquivo(antigo)
 
 
 @router.get("/{certificacao_id}/download")
@@ -21,11 +37,8 @@ def download_certificado(certificacao_id: int, db: Session = Depends(get_session
     c = db.get(Certificacao, certificacao_id)
     if not c or not c.certificado_arquivo:
         return JSONResponse({"error": "Certificado não encontrado"}, status_code=404)
-    path = os.path.abspath(c.certificado_arquivo)
-    if not os.path.exists(path):
-        return JSONResponse({"error": "Arquivo ausente no disco"}, status_code=410)
-    filename = os.path.basename(path)
-    return FileResponse(path, filename=filename, media_type="application/pdf")
+    # Local: arquivo (ou X-Accel-Redirect); S3: redirect para URL pré-assinada
+    return get_storage().resposta_download(c.certificado_arquivo)
 
 
 @router.post("/upload")
@@ -38,25 +51,47 @@ def upload_certificado(
     if not c:
         return {"error": "Certificação inválida"}
 
-    os.makedirs(os.path.join(STORAGE_ROOT, str(c.professor_id)), exist_ok=True)
-    ext = os.path.splitext(file.filename)[1].lower()
-    fname = f"{uuid.uuid4().hex}{ext or '.pdf'}"
-    path = os.path.join(STORAGE_ROOT, str(c.professor_id), fname)
+    chave = gerar_chave(c.professor_id, c.id)
+    get_storage().salvar(chave, file.file, file.content_type)
+    _vincular_arquivo(db, c, chave)
+    return {"ok": True, "certificado": {"id": c.id, "path": chave}}
+
 
-    with open(path, "wb") as f:
-        shutil.copyfileobj(file.file, f)
+@router.post("/upload-url")
+def upload_url_certificado(
+    certificacao_id: int = Form(...),
+    db: Session = Depends(get_session),
+):
+    """
+    Upload direto ao bucket (S3/MinIO): devolve um POST pré-assinado; depois
+    do envio, o cliente chama /certificados/upload-confirmar com a chave.
+    """
+    c = db.get(Certificacao, certificacao_id)
+    if not c:
+        return {"error": "Certificação inválida"}
+    chave = gerar_chave(c.professor_id, c.id)
+    post = get_storage().upload_direto(chave)
+    if post is None:
+        return JSONResponse({"error": "Backend de storage não aceita upload direto; use /certificados/upload"}, status_code=400)
+    return {"ok": True, "chave": chave, "url": post["url"], "fields": post["fields"]}
 
-    # Apaga antigo se existir
-    if c.certificado_arquivo and os.path.exists(c.certificado_arquivo):
-        try:
-            os.remove(c.certificado_arquivo)
-        except Exception:
-            pass
 
-    c.certificado_arquivo = path
-    c.status = StatusCert.CERTIFICADO
-    db.commit()
-    return {"ok": True, "certificado": {"id": c.id, "path": path}}
+@router.post("/upload-confirmar")
+def upload_confirmar_certificado(
+    certificacao_id: int = Form(...),
+    chave: str = Form(...),
+    db: Session = Depends(get_session),
+):
+    c = db.get(Certificacao, certificacao_id)
+    if not c:
+        return {"error": "Certificação inválida"}
+    # A chave tem que ter sido gerada para esta certificação (/upload-url) e já estar no bucket
+    if not chave_da_certificacao(chave, c.professor_id, c.id):
+        return JSONResponse({"error": "Chave não pertence a esta certificação"}, status_code=400)
+    if not get_storage().existe(chave):
+        return JSONResponse({"error": "Arquivo não encontrado no storage"}, status_code=400)
+    _vincular_arquivo(db, c, chave)
+    return {"ok": True, "certificado": {"id": c.id, "path": chave}}
 
 
 @router.post("/delete")
@@ -69,12 +104,7 @@ def excluir_certificado(
     if not c:
         return {"error": "Certificação inválida"}
 
-    # Remove arquivo
-    if c.certificado_arquivo and os.path.exists(c.certificado_arquivo):
-        try:
-            os.remove(c.certificado_arquivo)
-        except Exception:
-            pass
+    antigo = c.certificado_arquivo
     c.certificado_arquivo = None
 
     # Regra: manter status ou marcar como NÃO CERTIFICADO
@@ -82,4 +112,7 @@ def excluir_certificado(
         c.status = StatusCert.NAO_CERTIFICADO
 
     db.commit()
+    # Remove arquivo
+    if antigo:
+        _remover_arquivo(antigo)
     return {"ok": True}
@@ -1,14 +1,29 @@
 # app/db.py
+import ast
 import os
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session, sessionmaker
+from app.metricas import instrumentar_engine
 from app.models import Base
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./dev.db")
+# "production": o boot só confere a versão do schema (Alembic), sem DDL
+APP_ENV = os.getenv("APP_ENV", "dev")
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "alembic.ini")
 
-# Config extra para SQLite local
-connect_args = {"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
+# Config extra para SQLite local (timeout = espera pelo lock de escrita, em s)
+connect_args = {"check_same_thread": False, "timeout": 30} if DATABASE_URL.startswith("sqlite") else {}
 engine = create_engine(DATABASE_URL, pool_pre_ping=True, connect_args=connect_args)
+instrumentar_engine(engine)
+
+if engine.dialect.name == "sqlite":
+    @event.listens_for(engine, "connect")
+    def _sqlite_wal(dbapi_conn, _):
+        # WAL: leitores não bloqueiam o escritor (e vice-versa)
+        cur = dbapi_conn.cursor()
+        cur.execute("PRAGMA journal_mode=WAL")
+        cur.close()
 
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
 
@@ -18,6 +33,73 @@ def init_db() -> None:
     Base.metadata.create_all(engine)
 
 
+def _heads_alembic() -> set[str]:
+    """Heads das migrations lendo os arquivos com `ast` (importar o alembic custa ~150 ms)."""
+    pasta = os.path.join(os.path.dirname(ALEMBIC_INI), "alembic", "versions")
+    revisoes, anteriores = set(), set()
+    for nome in os.listdir(pasta):
+        if not nome.endswith(".py"):
+            continue
+        with open(os.path.join(pasta, nome), encoding="utf-8") as f:
+            arvore = ast.parse(f.read())
+        for no in arvore.body:
+            if isinstance(no, (ast.Assign, ast.AnnAssign)):
+                alvo = no.targets[0] if isinstance(no, ast.Assign) else no.target
+                if getattr(alvo, "id", None) == "revision":
+                    revisoes.add(ast.literal_eval(no.value))
+                elif getattr(alvo, "id", None) == "down_revision":
+                    valor = ast.literal_eval(no.value)
+                    if valor:
+                        anteriores.update(valor if isinstance(valor, (tuple, list)) else [valor])
+    return revisoes - anteriores
+
+
+def verificar_schema() -> None:
+    """
+    Prod: compara a revisão gravada no banco com o head das migrations.
+    Não executa DDL; se estiver defasado, falha o boot pedindo o upgrade.
+    """
+    heads = _heads_alembic()
+    with engine.connect() as conn:
+        if inspect(conn).has_table("alembic_version"):
+            atuais = set(conn.execute(text("SELECT version_num FROM alembic_version")).scalars())
+        else:
+            atuais = set()
+        criado_sem_alembic = not atuais and inspect(conn).has_table("ano")
+    if criado_sem_alembic:
+        raise RuntimeError(
+            "Banco criado por create_all, sem versão do Alembic. Adote uma vez com "
+            "`alembic stamp 0001` e depois `alembic upgrade head`."
+        )
+    if atuais != heads:
+        raise RuntimeError(
+            f"Schema desatualizado (banco: {sorted(atuais) or 'vazio'}, head: {sorted(heads)}). "
+            "Rode `alembic upgrade head`."
+        )
+
+
+def insert_ignorando_conflito(db: Session, Model):
+    """INSERT ... ON CONFLICT DO NOTHING no dialeto da sessão (SQLite/Postgres)."""
+    dialeto = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    return dialeto.insert(Model).on_conflict_do_nothing()
+
+
+def get_or_create(session: Session, Model, defaults=None, **where):
+    """
+    Busca por `where`; se não existir, insere sem corrida: com ON CONFLICT
+    DO NOTHING, quem perde a disputa pela constraint única só relê a linha
+    criada pelo outro em vez de estourar IntegrityError.
+    """
+    inst = session.query(Model).filter_by(**where).one_or_none()
+    if inst:
+        return inst, False
+    params = dict(where)
+    if defaults:
+        params.update(defaults)
+    created = session.execute(insert_ignorando_conflito(session, Model).values(**params)).rowcount == 1
+    return session.query(Model).filter_by(**where).one(), created
+
+
 def get_session():
     db = SessionLocal()
     try:
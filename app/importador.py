@@ -1,38 +1,32 @@
 # app/importador.py
+import time
 from io import BytesIO
-import pandas as pd
 from fastapi import APIRouter, UploadFile, File, Depends
 from sqlalchemy.orm import Session
 
-from app.db import get_session
-from app.models import DDZ, Escola, Professor, Ano, Turma, Certificacao, StatusCert
+from app.busca import reindexar
+from app.db import get_session, get_or_create
+from app.metricas import medir, registrar_importacao
+from app.models import DDZ, Escola, Professor, Ano, Certificacao, StatusCert
+from app.turmas import get_or_create_turma
 
 router = APIRouter(prefix="/importar", tags=["Importar"])
 
 
-def get_or_create(session: Session, Model, defaults=None, **where):
-    inst = session.query(Model).filter_by(**where).one_or_none()
-    if inst:
-        return inst, False
-    params = dict(where)
-    if defaults:
-        params.update(defaults)
-    inst = Model(**params)
-    session.add(inst)
-    session.flush()
-    return inst, True
-
-
 @router.post("/excel")
 async def importar_excel(file: UploadFile = File(...), db: Session = Depends(get_session)):
+    # pandas (numpy/openpyxl) é pesado: só carrega quando alguém importa
+    import pandas as pd
+
     raw = await file.read()
     name = file.filename.lower()
-    if name.endswith(".xlsx"):
-        df = pd.read_excel(BytesIO(raw))
-    elif name.endswith(".csv"):
-        df = pd.read_csv(BytesIO(raw))
-    else:
-        return {"error": "Formato inválido. Envie .xlsx ou .csv"}
+    with medir("parse"):
+        if name.endswith(".xlsx"):
+            df = pd.read_excel(BytesIO(raw))
+        elif name.endswith(".csv"):
+            df = pd.read_csv(BytesIO(raw))
+        else:
+            return {"error": "Formato inválido. Envie .xlsx ou .csv"}
 
     required = {"DDZ", "Escola", "Professor", "Ano", "Turma"}
     if not required.issubset(set(df.columns)):
@@ -40,7 +34,10 @@ async def importar_excel(file: UploadFile = File(...), db: Session = Depends(get
 
     inserted = dict(ddz=0, escola=0, professor=0, ano=0, turma=0, certificacao=0)
     skipped = 0
+    t0 = time.perf_counter()
     inconsistencias: list[dict] = []
+    professores_tocados: set[int] = set()
+    escolas_movidas: set[int] = set()
 
     for i, row in df.iterrows():
         try:
@@ -61,11 +58,14 @@ async def importar_excel(file: UploadFile = File(...), db: Session = Depends(get
             escola, created = get_or_create(db, Escola, nome=escola_nome, defaults={"ddz_id": ddz.id})
             if not created and escola.ddz_id != ddz.id:
                 escola.ddz_id = ddz.id  # corrige vínculo se vier trocado
+                escolas_movidas.add(escola.id)
             inserted["escola"] += int(created)
 
             # Professor (chave frouxa: nome + escola)
             prof, created = get_or_create(db, Professor, nome=prof_nome, escola_id=escola.id)
             inserted["professor"] += int(created)
+            if created:
+                professores_tocados.add(prof.id)
 
             # Ano
             ano, created = get_or_create(db, Ano, valor=ano_valor)
@@ -76,7 +76,7 @@ async def importar_excel(file: UploadFile = File(...), db: Session = Depends(get
                 numero = int(turma_label.split("/")[0])
             except Exception:
                 numero = 1  # fallback
-            turma, created = get_or_create(db, Turma, numero=numero, ano_id=ano.id)
+            turma, created = get_or_create_turma(db, numero, ano.id)
             inserted["turma"] += int(created)
 
             # Certificação (única por professor+turma)
@@ -101,5 +101,12 @@ async def importar_excel(file: UploadFile = File(...), db: Session = Depends(get
             inconsistencias.append({"linha": int(i) + 2, "erro": str(e)})
             continue
 
+    # Mantém o índice de busca em sincronia com o que foi criado/alterado
+    db.flush()
+    reindexar(db, professor_ids=professores_tocados)
+    for escola_id in escolas_movidas:
+        reindexar(db, escola_id=escola_id)
+
     db.commit()
+    registrar_importacao(len(df), time.perf_counter() - t0)
     return {"ok": True, "inserted": inserted, "skipped_existing_certifications": skipped, "inconsistencias": inconsistencias}
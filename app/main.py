@@ -5,14 +5,13 @@ from typing import Optional, Tuple
 from fastapi import FastAPI, Request, Depends, Form, status
 from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse
 from fastapi.staticfiles import StaticFiles
-from fastapi.templating import Jinja2Templates
 from sqlalchemy import func
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from sqlalchemy.orm import aliased
 
-from app.db import init_db, get_session
+from app.db import APP_ENV, engine, init_db, verificar_schema, get_session, get_or_create
 from app.models import (
     DDZ,
     Escola,
@@ -23,8 +22,10 @@ from app.models import (
     StatusCert,
 )
 from app.certificados import router as certificados_router
-from app.turmas import router as turmas_router
+from app.turmas import router as turmas_router, get_or_create_turma as _get_or_create_turma
 from app.importador import router as importador_router
+from app.busca import router as busca_router, criar_indice, reindexar, remover_do_indice
+from app.metricas import router as metricas_router, Templates, middleware_metricas
 
 
 # ------------------------------------------------------------------------------
@@ -33,7 +34,10 @@ from app.importador import router as importador_router
 app = FastAPI(title="Gestão de Certificados")
 
 app.mount("/static", StaticFiles(directory="static"), name="static")
-templates = Jinja2Templates(directory="templates")
+templates = Templates(directory="templates")
+
+# Latência por rota, SQL por requisição e Server-Timing (ver /metrics)
+app.middleware("http")(middleware_metricas)
 
 
 # ------------------------------------------------------------------------------
@@ -41,8 +45,13 @@ templates = Jinja2Templates(directory="templates")
 # ------------------------------------------------------------------------------
 @app.on_event("startup")
 def on_startup():
-    # Dev: cria tabelas (em prod, use Alembic)
-    init_db()
+    # Dev: cria tabelas e índice de busca. Prod: só confere se o banco está no
+    # head do Alembic (sem DDL; o índice vem da migration 0003)
+    if APP_ENV == "production":
+        verificar_schema()
+    else:
+        init_db()
+        criar_indice(engine)
     os.makedirs("storage/certificados", exist_ok=True)
 
 
@@ -62,24 +71,12 @@ def parse_turma_label(label: str) -> Optional[Tuple[int, int]]:
 
 
 def get_or_create_ano(db: Session, ano_valor: int) -> Ano:
-    ano = db.query(Ano).filter_by(valor=ano_valor).one_or_none()
-    if not ano:
-        ano = Ano(valor=ano_valor)
-        db.add(ano)
-        db.flush()
+    ano, _ = get_or_create(db, Ano, valor=ano_valor)
     return ano
 
 
 def get_or_create_turma(db: Session, numero: int, ano: Ano) -> Turma:
-    turma = (
-        db.query(Turma)
-        .filter(Turma.numero == numero, Turma.ano_id == ano.id)
-        .one_or_none()
-    )
-    if not turma:
-        turma = Turma(numero=numero, ano_id=ano.id)
-        db.add(turma)
-        db.flush()
+    turma, _ = _get_or_create_turma(db, numero, ano.id)
     return turma
 
 
@@ -302,6 +299,8 @@ def ddz_update(ddz_id: int, nome: str = Form(...), db: Session = Depends(get_ses
     if d:
         d.nome = nome.strip()
         try:
+            db.flush()
+            reindexar(db, ddz_id=d.id)
             db.commit()
         except IntegrityError:
             db.rollback()
@@ -313,6 +312,10 @@ def ddz_delete(ddz_id: int, db: Session = Depends(get_session)):
     d = db.get(DDZ, ddz_id)
     if d:
         try:
+            remover_do_indice(
+                db,
+                [pid for (pid,) in db.query(Professor.id).join(Escola).filter(Escola.ddz_id == d.id)],
+            )
             db.delete(d)
             db.commit()
         except IntegrityError:
@@ -356,6 +359,8 @@ def escola_update(
         e.nome = nome.strip()
         e.ddz_id = d.id
         try:
+            db.flush()
+            reindexar(db, escola_id=e.id)
             db.commit()
         except IntegrityError:
             db.rollback()
@@ -367,6 +372,7 @@ def escola_delete(escola_id: int, db: Session = Depends(get_session)):
     e = db.get(Escola, escola_id)
     if e:
         try:
+            remover_do_indice(db, [pid for (pid,) in db.query(Professor.id).filter_by(escola_id=e.id)])
             db.delete(e)
             db.commit()
         except IntegrityError:
@@ -421,6 +427,7 @@ def professor_create(
                     )
                     db.add(cert)
 
+        reindexar(db, professor_ids=[p.id])
         db.commit()
     except IntegrityError:
         db.rollback()
@@ -433,6 +440,7 @@ def professor_delete(prof_id: int, db: Session = Depends(get_session)):
     p = db.get(Professor, prof_id)
     if p:
         try:
+            remover_do_indice(db, [p.id])
             db.delete(p)
             db.commit()
         except IntegrityError:
@@ -467,8 +475,10 @@ def anos_delete(ano_id: int, db: Session = Depends(get_session)):
 
 
 # ------------------------------------------------------------------------------
-# INCLUDE ROUTERS (Certificados / Turmas / Importação)
+# INCLUDE ROUTERS (Certificados / Turmas / Importação / Busca / Métricas)
 # ------------------------------------------------------------------------------
 app.include_router(certificados_router)
 app.include_router(turmas_router)
 app.include_router(importador_router)
+app.include_router(busca_router)
+app.include_router(metricas_router)
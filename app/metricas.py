@@ -0,0 +1,258 @@
+# app/metricas.py
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from fastapi import APIRouter, Request
+from fastapi.responses import PlainTextResponse
+from fastapi.templating import Jinja2Templates
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.sql.util import _repr_params
+
+router = APIRouter(tags=["Métricas"])
+logger = logging.getLogger("app.metricas")
+
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+
+# Buckets padrão do cliente Prometheus (segundos)
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+
+
+# ------------------------------------------------------------------------------
+# REGISTRO (contadores / histogramas em memória, por processo)
+# ------------------------------------------------------------------------------
+class Histograma:
+    def __init__(self, nome: str, ajuda: str, labels: tuple[str, ...] = (), buckets=BUCKETS):
+        self.nome, self.ajuda, self.labels, self.buckets = nome, ajuda, labels, buckets
+        self._series: dict[tuple, list] = {}  # labels -> [contagens por bucket, soma, total]
+        self._lock = threading.Lock()
+
+    def observar(self, valor: float, *label_values) -> None:
+        with self._lock:
+            s = self._series.setdefault(label_values, [[0] * len(self.buckets), 0.0, 0])
+            for i, b in enumerate(self.buckets):
+                if valor <= b:
+                    s[0][i] += 1
+            s[1] += valor
+            s[2] += 1
+
+    def exportar(self) -> list[str]:
+        linhas = [f"# HELP {self.nome} {self.ajuda}", f"# TYPE {self.nome} histogram"]
+        with self._lock:
+            for lv, (contagens, soma, total) in sorted(self._series.items()):
+                base = _labels(self.labels, lv)
+                for b, c in zip(self.buckets, contagens):
+                    linhas.append(f"{self.nome}_bucket{_labels(self.labels + ('le',), lv + (repr(b),))} {c}")
+                linhas.append(f"{self.nome}_bucket{_labels(self.labels + ('le',), lv + ('+Inf',))} {total}")
+                linhas.append(f"{self.nome}_sum{base} {soma}")
+                linhas.append(f"{self.nome}_count{base} {total}")
+        return linhas
+
+
+class Contador:
+    tipo = "counter"
+
+    def __init__(self, nome: str, ajuda: str, labels: tuple[str, ...] = ()):
+        self.nome, self.ajuda, self.labels = nome, ajuda, labels
+        self._series: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, valor: float = 1, *label_values) -> None:
+        with self._lock:
+            self._series[label_values] = self._series.get(label_values, 0) + valor
+
+    def set(self, valor: float, *label_values) -> None:
+        with self._lock:
+            self._series[label_values] = valor
+
+    def exportar(self) -> list[str]:
+        linhas = [f"# HELP {self.nome} {self.ajuda}", f"# TYPE {self.nome} {self.tipo}"]
+        with self._lock:
+            for lv, v in sorted(self._series.items()):
+                linhas.append(f"{self.nome}{_labels(self.labels, lv)} {v}")
+        return linhas
+
+
+class Gauge(Contador):
+    tipo = "gauge"
+
+
+def _labels(nomes: tuple[str, ...], valores: tuple) -> str:
+    if not nomes:
+        return ""
+    pares = ",".join(
+        f'{n}="{str(v).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+        for n, v in zip(nomes, valores)
+    )
+    return "{" + pares + "}"
+
+
+http_latencia = Histograma(
+    "http_request_duration_seconds", "Latência das requisições HTTP.", ("method", "route", "status")
+)
+http_sql_queries = Histograma(
+    "http_request_sql_queries", "Quantidade de statements SQL por requisição.", ("route",),
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 250, 500, 1000),
+)
+http_sql_tempo = Histograma(
+    "http_request_sql_duration_seconds", "Tempo gasto em SQL por requisição.", ("route",)
+)
+http_render_tempo = Histograma(
+    "http_request_template_duration_seconds", "Tempo de renderização de templates por requisição.", ("route",)
+)
+sql_lentas = Contador("sql_slow_queries_total", f"Statements SQL acima de {SLOW_QUERY_MS:g} ms.")
+importacao_linhas = Contador("importacao_linhas_total", "Linhas processadas pelo importador.")
+importacao_tempo = Histograma(
+    "importacao_duration_seconds", "Duração de cada importação.",
+    buckets=(0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0),
+)
+importacao_linhas_por_segundo = Gauge(
+    "importacao_linhas_por_segundo", "Throughput (linhas/s) da última importação."
+)
+
+METRICAS = (
+    http_latencia, http_sql_queries, http_sql_tempo, http_render_tempo, sql_lentas,
+    importacao_linhas, importacao_tempo, importacao_linhas_por_segundo,
+)
+
+
+# ------------------------------------------------------------------------------
+# CONTEXTO POR REQUISIÇÃO
+# ------------------------------------------------------------------------------
+@dataclass
+class Tempos:
+    sql_count: int = 0
+    sql_tempo: float = 0.0
+    render_tempo: float = 0.0
+    extras: dict[str, float] = field(default_factory=dict)
+
+
+_tempos: ContextVar[Tempos | None] = ContextVar("tempos", default=None)
+
+
+@contextmanager
+def coletar():
+    """Ativa a coleta de tempos (SQL, render, `medir`) no contexto atual."""
+    tempos = Tempos()
+    token = _tempos.set(tempos)
+    try:
+        yield tempos
+    finally:
+        _tempos.reset(token)
+
+
+@contextmanager
+def medir(nome: str):
+    """Soma a duração do bloco em Server-Timing (`nome`) da requisição atual."""
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        atual = _tempos.get()
+        if atual is not None:
+            atual.extras[nome] = atual.extras.get(nome, 0.0) + time.perf_counter() - t0
+
+
+def instrumentar_engine(engine: Engine) -> None:
+    """Conta/cronometra cada statement e loga os lentos com parâmetros."""
+
+    # O início fica no context do statement: se ele falhar, nada sobra na
+    # conexão. Execuções especiais (sequences/defaults) vêm sem context e usam
+    # um slot único em conn.info, sobrescrito a cada uso.
+    @event.listens_for(engine, "before_cursor_execute")
+    def _antes(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._t0_metricas = time.perf_counter()
+        else:
+            conn.info["_t0_metricas"] = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _depois(conn, cursor, statement, parameters, context, executemany):
+        t0 = context._t0_metricas if context is not None else conn.info.pop("_t0_metricas")
+        dur = time.perf_counter() - t0
+        atual = _tempos.get()
+        if atual is not None:
+            atual.sql_count += 1
+            atual.sql_tempo += dur
+        if dur * 1000 >= SLOW_QUERY_MS:
+            sql_lentas.inc()
+            # Mesmo corte do echo do SQLAlchemy: executemany loga só 10 dos lotes
+            params = _repr_params(parameters, batches=10, ismulti=executemany)
+            logger.warning("SQL lenta (%.1f ms): %s | params=%r", dur * 1000, statement, params)
+
+
+class Templates(Jinja2Templates):
+    """Jinja2Templates que mede o tempo de renderização por requisição."""
+
+    def TemplateResponse(self, *args, **kwargs):
+        t0 = time.perf_counter()
+        try:
+            return super().TemplateResponse(*args, **kwargs)
+        finally:
+            atual = _tempos.get()
+            if atual is not None:
+                atual.render_tempo += time.perf_counter() - t0
+
+
+def _rota(request: Request) -> str:
+    # Usa o template da rota ("/certificados/{certificacao_id}/download") para
+    # não explodir a cardinalidade com ids
+    route = request.scope.get("route")
+    if route is not None:
+        return getattr(route, "path", request.url.path)
+    if request.url.path.startswith("/static/"):
+        return "/static"
+    return "<nao_encontrada>"
+
+
+def _observar(request: Request, tempos: Tempos, total: float, status: str) -> None:
+    rota = _rota(request)
+    http_latencia.observar(total, request.method, rota, status)
+    if rota != "/static":
+        http_sql_queries.observar(tempos.sql_count, rota)
+        http_sql_tempo.observar(tempos.sql_tempo, rota)
+        if tempos.render_tempo:
+            http_render_tempo.observar(tempos.render_tempo, rota)
+
+
+async def middleware_metricas(request: Request, call_next):
+    t0 = time.perf_counter()
+    with coletar() as tempos:
+        try:
+            response = await call_next(request)
+        except Exception:
+            # Exceção não tratada vira 500 no ServerErrorMiddleware; registra antes de propagar
+            _observar(request, tempos, time.perf_counter() - t0, "500")
+            raise
+    total = time.perf_counter() - t0
+    _observar(request, tempos, total, str(response.status_code))
+
+    # Server-Timing para o DevTools do navegador (durações em ms)
+    app_tempo = max(total - tempos.sql_tempo - tempos.render_tempo - sum(tempos.extras.values()), 0.0)
+    partes = [f'db;dur={tempos.sql_tempo * 1000:.1f};desc="{tempos.sql_count} queries"']
+    if tempos.render_tempo:
+        partes.append(f"tpl;dur={tempos.render_tempo * 1000:.1f}")
+    partes += [f"{nome};dur={dur * 1000:.1f}" for nome, dur in tempos.extras.items()]
+    partes += [f"app;dur={app_tempo * 1000:.1f}", f"total;dur={total * 1000:.1f}"]
+    response.headers["Server-Timing"] = ", ".join(partes)
+    return response
+
+
+def registrar_importacao(linhas: int, duracao: float) -> None:
+    importacao_linhas.inc(linhas)
+    importacao_tempo.observar(duracao)
+    if duracao > 0:
+        importacao_linhas_por_segundo.set(linhas / duracao)
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def metrics():
+    linhas: list[str] = []
+    for m in METRICAS:
+        linhas.extend(m.exportar())
+    return PlainTextResponse("\n".join(linhas) + "\n", media_type="text/plain; version=0.0.4")
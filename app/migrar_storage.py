@@ -0,0 +1,135 @@
+# app/migrar_storage.py
+"""
+Move os certificados do disco local para o backend configurado
+(STORAGE_BACKEND / S3_*) e regrava `certificado_arquivo` como chave.
+
+    STORAGE_BACKEND=s3 S3_BUCKET=certificados S3_ENDPOINT_URL=http://localhost:9000 \\
+        python -m app.migrar_storage --threads 16
+    python -m app.migrar_storage --dry-run
+    python -m app.migrar_storage --apagar-origem    # remove o arquivo local após o commit
+
+Também serve para STORAGE_BACKEND=local: converte caminhos antigos
+("storage/certificados/3/x.pdf") em chaves ("3/x.pdf") sem copiar nada.
+Idempotente: arquivos cujo objeto já existe no destino não são copiados de
+novo (com --apagar-origem, a cópia local deles é removida).
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import select, update
+
+from app.db import SessionLocal
+from app.models import Certificacao
+from app.storage import STORAGE_ROOT, LocalStorage, S3Storage, eh_caminho_legado, get_storage, normalizar_caminho
+
+
+def _chave_destino(professor_id: int, valor: str) -> str:
+    if not eh_caminho_legado(valor):
+        return valor  # já é chave (gravada pelo backend local)
+    return f"{professor_id}/{os.path.basename(normalizar_caminho(valor))}"
+
+
+def migrar(origem_raiz: str = STORAGE_ROOT, threads: int = 16, lote: int = 500,
+           apagar_origem: bool = False, dry_run: bool = False) -> dict:
+    origem = LocalStorage(origem_raiz)
+    destino = get_storage()
+    mesmo_disco = isinstance(destino, LocalStorage)
+    # S3Storage.existe cai no disco local para chaves não migradas; aqui só vale o bucket
+    no_destino = destino.existe_no_bucket if isinstance(destino, S3Storage) else destino.existe
+    stats = {"lidas": 0, "copiadas": 0, "renomeadas": 0, "puladas": 0, "ausentes": 0, "erros": 0, "apagadas": 0}
+
+    def copiar(item):
+        cert_id, valor, chave, src = item
+        if mesmo_disco and destino.caminho(chave) == src:
+            return item, "renomeada"
+        try:
+            if no_destino(chave):
+                return item, "existente"
+            with open(src, "rb") as f:
+                destino.salvar(chave, f, "application/pdf")
+            return item, "copiada"
+        except Exception as e:
+            print(f"erro cert {cert_id} ({src}): {e}", file=sys.stderr)
+            return item, "erro"
+
+    def processar(pendentes, pool, escrita):
+        feitos = []
+        for item, resultado in pool.map(copiar, pendentes):
+            if resultado == "erro":
+                stats["erros"] += 1
+                continue
+            stats[{"copiada": "copiadas", "renomeada": "renomeadas", "existente": "puladas"}[resultado]] += 1
+            feitos.append((item, resultado))
+        # Só troca se a linha ainda aponta para o mesmo valor (upload concorrente ganha)
+        for (cert_id, valor, chave, _), _ in feitos:
+            escrita.execute(
+                update(Certificacao)
+                .where(Certificacao.id == cert_id, Certificacao.certificado_arquivo == valor)
+                .values(certificado_arquivo=chave)
+            )
+        escrita.commit()
+        if apagar_origem:
+            for (_, _, _, src), resultado in feitos:
+                if resultado in ("copiada", "existente"):
+                    try:
+                        os.remove(src)
+                        stats["apagadas"] += 1
+                    except OSError:
+                        pass
+
+    t0 = time.perf_counter()
+    # Leitura em streaming numa sessão e escrita em outra: o commit de cada
+    # lote não fecha o cursor do lado do servidor
+    with SessionLocal() as leitura, SessionLocal() as escrita, ThreadPoolExecutor(max_workers=threads) as pool:
+        linhas = leitura.execute(
+            select(Certificacao.id, Certificacao.professor_id, Certificacao.certificado_arquivo)
+            .where(Certificacao.certificado_arquivo.is_not(None))
+            .order_by(Certificacao.id)
+            .execution_options(yield_per=lote)
+        )
+        pendentes = []
+        for cert_id, professor_id, valor in linhas:
+            stats["lidas"] += 1
+            chave = _chave_destino(professor_id, valor)
+            if mesmo_disco and chave == valor:
+                stats["puladas"] += 1
+                continue
+            src = origem.caminho(valor)
+            if not os.path.isfile(src):
+                # Já está no destino (ou sumiu: ver app.reconciliacao)
+                stats["puladas" if not eh_caminho_legado(valor) else "ausentes"] += 1
+                continue
+            if dry_run:
+                stats["renomeadas" if mesmo_disco and destino.caminho(chave) == src else "copiadas"] += 1
+                continue
+            pendentes.append((cert_id, valor, chave, src))
+            if len(pendentes) >= lote:
+                processar(pendentes, pool, escrita)
+                pendentes = []
+        if pendentes:
+            processar(pendentes, pool, escrita)
+
+    stats["duracao_s"] = round(time.perf_counter() - t0, 3)
+    stats["destino"] = destino.nome
+    return stats
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--origem", default=STORAGE_ROOT, help="Raiz local de origem")
+    ap.add_argument("--threads", type=int, default=16)
+    ap.add_argument("--lote", type=int, default=500)
+    ap.add_argument("--apagar-origem", action="store_true")
+    ap.add_argument("--dry-run", action="store_true")
+    args = ap.parse_args(argv)
+
+    stats = migrar(args.origem, args.threads, args.lote, args.apagar_origem, args.dry_run)
+    print(" ".join(f"{k}={v}" for k, v in stats.items()), file=sys.stderr)
+    return 1 if stats["erros"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
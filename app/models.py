@@ -41,6 +41,7 @@ class Ano(Base):
     id: Mapped[int] = mapped_column(primary_key=True)
     valor: Mapped[int] = mapped_column(index=True, unique=True)
     turmas: Mapped[list["Turma"]] = relationship(back_populates="ano", cascade="all,delete")
+    sequencia: Mapped["TurmaSequencia | None"] = relationship(cascade="all,delete")
 
 
 class Turma(Base):
@@ -60,6 +61,13 @@ class Turma(Base):
         return f"{self.numero}/—"
 
 
+class TurmaSequencia(Base):
+    """Último número de turma alocado por ano (incrementado atomicamente em app/turmas.py)."""
+    __tablename__ = "turma_sequencia"
+    ano_id: Mapped[int] = mapped_column(ForeignKey("ano.id", ondelete="CASCADE"), primary_key=True)
+    ultimo_numero: Mapped[int] = mapped_column(default=0)
+
+
 class StatusCert(str, Enum):
     CERTIFICADO = "CERTIFICADO"
     NAO_CERTIFICADO = "NAO_CERTIFICADO"
@@ -0,0 +1,317 @@
+# app/reconciliacao.py
+"""
+Reconciliação entre `Certificacao.certificado_arquivo` e o storage em disco.
+
+    python -m app.reconciliacao                 # só relatório
+    python -m app.reconciliacao --corrigir      # aplica as correções seguras
+    python -m app.reconciliacao --completo      # ignora o cache incremental
+
+Problemas reportados:
+  ausente                  linha aponta para arquivo que não existe
+  orfao                    arquivo no storage sem nenhuma linha apontando
+  vazio                    arquivo referenciado com 0 bytes
+  nao_pdf                  arquivo referenciado sem cabeçalho %PDF-
+  certificado_sem_arquivo  status CERTIFICADO sem arquivo
+
+Com --corrigir: `ausente` e `vazio` têm a referência limpa, se o arquivo
+continuar faltando/vazio na hora da correção (o arquivo vazio é apagado; o
+status é mantido, como em /certificados/delete) e `orfao` mais
+velho que --idade-minima é apagado. `nao_pdf` e `certificado_sem_arquivo`
+só são reportados.
+
+Incremental: o estado da última execução guarda, por diretório, o mtime e a
+listagem classificada. Diretório com o mesmo mtime não é relistado e arquivo
+com mesmo tamanho/mtime não é relido. Os nomes são uuid (só criados/apagados,
+nunca reescritos), então isso basta; use --completo para forçar tudo.
+
+Vale para o backend local. No S3 (STORAGE_BACKEND=s3) use o inventário e as
+regras de ciclo de vida do bucket.
+"""
+import argparse
+import gzip
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import select, update
+
+from app.db import SessionLocal
+from app.models import Certificacao, StatusCert
+from app.storage import STORAGE_ROOT, LocalStorage
+
+ESTADO_VERSAO = 1
+PDF_MAGIC = b"%PDF-"
+
+
+def _classificar(path: str, tamanho: int) -> str:
+    if tamanho == 0:
+        return "vazio"
+    try:
+        with open(path, "rb") as f:
+            return "pdf" if f.read(len(PDF_MAGIC)) == PDF_MAGIC else "nao_pdf"
+    except OSError:
+        return "ilegivel"
+
+
+# ------------------------------------------------------------------------------
+# VARREDURA DO STORAGE
+# ------------------------------------------------------------------------------
+def _varrer(raiz: str, rel: str, cache: dict, completo: bool, novo_cache: dict, stats: dict) -> None:
+    """Varre `raiz/rel` recursivamente preenchendo `novo_cache[rel]`."""
+    caminho = os.path.join(raiz, rel) if rel else raiz
+    try:
+        mtime_dir = os.stat(caminho).st_mtime_ns
+    except FileNotFoundError:  # subdiretório do cache que sumiu
+        return
+    anterior = cache.get(rel)
+
+    if not completo and anterior and anterior["mtime"] == mtime_dir:
+        novo_cache[rel] = anterior
+        stats["dirs_reaproveitados"] += 1
+        for sub in anterior.get("subdirs", []):
+            _varrer(raiz, os.path.join(rel, sub) if rel else sub, cache, completo, novo_cache, stats)
+        return
+
+    stats["dirs_listados"] += 1
+    antigos = (anterior or {}).get("arquivos", {}) if not completo else {}
+    arquivos, subdirs = {}, []
+    with os.scandir(caminho) as it:
+        for entry in it:
+            if entry.name.startswith("."):
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                subdirs.append(entry.name)
+                continue
+            if not entry.is_file(follow_symlinks=False):
+                continue
+            st = entry.stat(follow_symlinks=False)
+            velho = antigos.get(entry.name)
+            if velho and velho[0] == st.st_size and velho[1] == st.st_mtime_ns:
+                tipo = velho[2]
+            else:
+                tipo = _classificar(entry.path, st.st_size)
+                stats["arquivos_lidos"] += 1
+            arquivos[entry.name] = [st.st_size, st.st_mtime_ns, tipo]
+
+    novo_cache[rel] = {"mtime": mtime_dir, "arquivos": arquivos, "subdirs": subdirs}
+    for sub in subdirs:
+        _varrer(raiz, os.path.join(rel, sub) if rel else sub, cache, completo, novo_cache, stats)
+
+
+def varrer_storage(raiz: str, cache: dict, completo: bool = False, threads: int = 8) -> tuple[dict, dict]:
+    """Varre o storage em paralelo (uma subárvore de 1º nível por tarefa)."""
+    stats = {"dirs_listados": 0, "dirs_reaproveitados": 0, "arquivos_lidos": 0}
+    novo_cache: dict = {}
+    if not os.path.isdir(raiz):
+        return novo_cache, stats
+
+    # 1º nível (pastas por professor) sempre relistado: barato e define as tarefas
+    raiz_arquivos, topo = {}, []
+    antigos = cache.get("", {}).get("arquivos", {}) if not completo else {}
+    with os.scandir(raiz) as it:
+        for entry in it:
+            if entry.name.startswith("."):
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                topo.append(entry.name)
+            elif entry.is_file(follow_symlinks=False):
+                st = entry.stat(follow_symlinks=False)
+                velho = antigos.get(entry.name)
+                if velho and velho[0] == st.st_size and velho[1] == st.st_mtime_ns:
+                    tipo = velho[2]
+                else:
+                    tipo = _classificar(entry.path, st.st_size)
+                raiz_arquivos[entry.name] = [st.st_size, st.st_mtime_ns, tipo]
+    novo_cache[""] = {"mtime": os.stat(raiz).st_mtime_ns, "arquivos": raiz_arquivos, "subdirs": topo}
+
+    # Cada thread escreve em dicionários próprios; junta no final
+    def tarefa(nome):
+        parcial, st = {}, {k: 0 for k in stats}
+        _varrer(raiz, nome, cache, completo, parcial, st)
+        return parcial, st
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        for parcial, st in pool.map(tarefa, topo):
+            novo_cache.update(parcial)
+            for k, v in st.items():
+                stats[k] += v
+    return novo_cache, stats
+
+
+# ------------------------------------------------------------------------------
+# RECONCILIAÇÃO
+# ------------------------------------------------------------------------------
+def _carregar_estado(path: str) -> dict:
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            estado = json.load(f)
+        return estado if estado.get("versao") == ESTADO_VERSAO else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def _salvar_estado(path: str, estado: dict) -> None:
+    tmp = f"{path}.tmp"
+    with gzip.open(tmp, "wt", encoding="utf-8") as f:
+        json.dump(estado, f, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+def reconciliar(
+    raiz: str = STORAGE_ROOT,
+    estado_path: str | None = None,
+    corrigir: bool = False,
+    completo: bool = False,
+    idade_minima: float = 3600,
+    threads: int = 8,
+    lote: int = 10_000,
+) -> dict:
+    t0 = time.time()
+    raiz_abs = os.path.abspath(raiz)
+    local = LocalStorage(raiz)
+    estado = _carregar_estado(estado_path) if estado_path else {}
+
+    cache, stats = varrer_storage(raiz_abs, {} if completo else estado.get("dirs", {}), completo, threads)
+    no_disco: dict[str, list] = {}
+    for rel, d in cache.items():
+        base = os.path.join(raiz_abs, rel) if rel else raiz_abs
+        for nome, info in d["arquivos"].items():
+            no_disco[os.path.join(base, nome)] = info
+
+    problemas: dict[str, list] = {k: [] for k in ("ausente", "orfao", "vazio", "nao_pdf", "certificado_sem_arquivo")}
+    referenciados: set[str] = set()
+
+    with SessionLocal() as db:
+        # Server-side cursor: as linhas chegam em lotes, sem carregar a tabela inteira
+        linhas = db.execute(
+            select(Certificacao.id, Certificacao.certificado_arquivo, Certificacao.status)
+            .order_by(Certificacao.id)
+            .execution_options(yield_per=lote)
+        )
+        for cert_id, arquivo, status in linhas:
+            if not arquivo:
+                if status == StatusCert.CERTIFICADO:
+                    problemas["certificado_sem_arquivo"].append({"cert_id": cert_id})
+                continue
+            path = local.caminho(arquivo)
+            referenciados.add(path)
+            info = no_disco.get(path)
+            if info is None and not path.startswith(raiz_abs + os.sep):
+                # Fora do storage varrido: confere direto
+                if os.path.isfile(path):
+                    tamanho = os.path.getsize(path)
+                    info = [tamanho, 0, _classificar(path, tamanho)]
+            item = {"cert_id": cert_id, "arquivo": arquivo}
+            if info is None:
+                problemas["ausente"].append(item)
+            elif info[2] == "vazio":
+                problemas["vazio"].append(item)
+            elif info[2] != "pdf":
+                problemas["nao_pdf"].append(item)
+
+        limite = time.time() - idade_minima
+        for path, (tamanho, mtime_ns, _) in no_disco.items():
+            if path not in referenciados:
+                problemas["orfao"].append({
+                    "arquivo": os.path.relpath(path),
+                    "bytes": tamanho,
+                    "recente": mtime_ns / 1e9 > limite,
+                })
+
+        corrigidos = {"referencias_limpas": 0, "referencias_mantidas": 0, "arquivos_apagados": 0}
+        if corrigir:
+            # O disco foi varrido antes de as linhas serem lidas: um upload que
+            # gravou o arquivo e fez commit nesse meio aparece como ausente.
+            # Por isso o arquivo é conferido de novo antes de limpar, e a linha
+            # só é limpa se ainda aponta para o valor visto.
+            limpar = problemas["ausente"] + problemas["vazio"]
+            vazios = {p["cert_id"] for p in problemas["vazio"]}
+            limpos = []
+            for i in range(0, len(limpar), lote):
+                for p in limpar[i:i + lote]:
+                    path = local.caminho(p["arquivo"])
+                    if os.path.isfile(path) and os.path.getsize(path) > 0:
+                        corrigidos["referencias_mantidas"] += 1
+                        continue
+                    r = db.execute(
+                        update(Certificacao)
+                        .where(Certificacao.id == p["cert_id"], Certificacao.certificado_arquivo == p["arquivo"])
+                        .values(certificado_arquivo=None)
+                    )
+                    corrigidos["referencias_limpas"] += r.rowcount
+                    if r.rowcount:
+                        limpos.append(p)
+                db.commit()
+
+            # Só apaga depois do commit: se o banco falhar, nada some do disco.
+            # Órfãos recentes ficam (upload grava o arquivo antes do commit).
+            apagar = [local.caminho(p["arquivo"]) for p in limpos if p["cert_id"] in vazios]
+            apagar += [os.path.abspath(p["arquivo"]) for p in problemas["orfao"] if not p["recente"]]
+            for path in apagar:
+                try:
+                    os.remove(path)
+                    corrigidos["arquivos_apagados"] += 1
+                except OSError:
+                    pass
+
+    if estado_path:
+        _salvar_estado(estado_path, {"versao": ESTADO_VERSAO, "executado_em": t0, "dirs": cache})
+
+    return {
+        "storage": raiz,
+        "arquivos_no_storage": len(no_disco),
+        "referencias": len(referenciados),
+        "varredura": stats,
+        "duracao_s": round(time.time() - t0, 3),
+        "totais": {k: len(v) for k, v in problemas.items()},
+        "corrigidos": corrigidos if corrigir else None,
+        "problemas": problemas,
+    }
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--storage", default=STORAGE_ROOT)
+    ap.add_argument("--estado", help="Arquivo de estado incremental (default: <storage>/../.reconciliacao.json.gz)")
+    ap.add_argument("--corrigir", action="store_true")
+    ap.add_argument("--completo", action="store_true", help="Ignora o estado e relê tudo")
+    ap.add_argument("--idade-minima", type=float, default=3600, help="Órfãos mais novos (s) não são apagados")
+    ap.add_argument("--threads", type=int, default=8)
+    ap.add_argument("--saida", help="Grava o relatório completo em JSON")
+    args = ap.parse_args(argv)
+    if os.getenv("STORAGE_BACKEND", "local") != "local":
+        print("app.reconciliacao só se aplica ao STORAGE_BACKEND=local", file=sys.stderr)
+        return 2
+
+    estado = args.estado or os.path.join(
+        os.path.dirname(os.path.abspath(args.storage)), ".reconciliacao.json.gz"
+    )
+    rel = reconciliar(
+        raiz=args.storage,
+        estado_path=estado,
+        corrigir=args.corrigir,
+        completo=args.completo,
+        idade_minima=args.idade_minima,
+        threads=args.threads,
+    )
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as f:
+            json.dump(rel, f, ensure_ascii=False, indent=2)
+
+    print(
+        f"{rel['arquivos_no_storage']} arquivos, {rel['referencias']} referências em {rel['duracao_s']}s "
+        f"(dirs listados={rel['varredura']['dirs_listados']}, reaproveitados={rel['varredura']['dirs_reaproveitados']}, "
+        f"lidos={rel['varredura']['arquivos_lidos']})",
+        file=sys.stderr,
+    )
+    for k, v in rel["totais"].items():
+        print(f"  {k:<24} {v}", file=sys.stderr)
+    if rel["corrigidos"]:
+        print(f"  corrigidos: {rel['corrigidos']}", file=sys.stderr)
+    return 1 if any(rel["totais"].values()) and not args.corrigir else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
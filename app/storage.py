@@ -0,0 +1,215 @@
+# app/storage.py
+"""
+Backends de armazenamento dos certificados.
+
+`Certificacao.certificado_arquivo` guarda uma CHAVE relativa ao backend
+("<professor_id>/<certificacao_id>-<uuid>.pdf"; antes "<professor_id>/<uuid>.pdf").
+Linhas antigas guardam o caminho local cru ("storage/certificados/3/x.pdf"
+ou absoluto). Com S3, tanto esses caminhos quanto chaves cujo arquivo ainda
+está no disco local continuam sendo servidos do disco até
+`python -m app.migrar_storage` movê-los.
+
+Configuração (ambiente):
+  STORAGE_BACKEND        local (padrão) | s3
+  CERTS_DIR              raiz do backend local (padrão storage/certificados)
+  LOCAL_X_ACCEL_PREFIX   se definido, o download local responde com
+                         X-Accel-Redirect (o nginx entrega o arquivo)
+  S3_BUCKET, S3_PREFIX, S3_ENDPOINT_URL (MinIO: http://localhost:9000),
+  S3_PRESIGN_EXPIRES (s, padrão 300); credenciais nas variáveis AWS_* usuais
+  (para o upload direto do navegador, o bucket precisa de CORS liberando POST
+  a partir da origem do app)
+"""
+import os
+import re
+import shutil
+import uuid
+from functools import lru_cache
+from typing import BinaryIO
+from urllib.parse import quote
+
+from fastapi.responses import FileResponse, JSONResponse, RedirectResponse, Response
+
+STORAGE_ROOT = os.getenv("CERTS_DIR", "storage/certificados")
+MAX_UPLOAD_BYTES = 20 * 1024 * 1024
+
+
+def gerar_chave(professor_id: int, certificacao_id: int) -> str:
+    # Sempre .pdf: o nome do arquivo vem do cliente, e o POST direto ao bucket
+    # já exige Content-Type application/pdf
+    return f"{professor_id}/{certificacao_id}-{uuid.uuid4().hex}.pdf"
+
+
+def chave_da_certificacao(chave: str, professor_id: int, certificacao_id: int) -> bool:
+    """Chave no formato gerado por gerar_chave para essa certificação."""
+    return re.fullmatch(rf"{professor_id}/{certificacao_id}-[0-9a-f]{{32}}\.pdf", chave) is not None
+
+
+def normalizar_caminho(path: str) -> str:
+    # Há caminhos gravados no Windows ("storage/certificados\3\x.pdf")
+    return path.replace("\\", "/") if os.sep == "/" else path
+
+
+def eh_caminho_legado(valor: str) -> bool:
+    """Valor gravado antes das chaves: caminho absoluto ou sob STORAGE_ROOT."""
+    p = normalizar_caminho(valor)
+    raiz = normalizar_caminho(STORAGE_ROOT).rstrip("/") + "/"
+    return os.path.isabs(p) or p.startswith(raiz)
+
+
+class LocalStorage:
+    nome = "local"
+
+    def __init__(self, raiz: str = STORAGE_ROOT, x_accel_prefix: str | None = None):
+        self.raiz = os.path.abspath(raiz)
+        self.x_accel_prefix = x_accel_prefix
+
+    def caminho(self, valor: str) -> str:
+        p = normalizar_caminho(valor)
+        if eh_caminho_legado(p):
+            return os.path.abspath(p)
+        return os.path.join(self.raiz, p)
+
+    def salvar(self, chave: str, fileobj: BinaryIO, content_type: str | None = None) -> None:
+        path = self.caminho(chave)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            shutil.copyfileobj(fileobj, f)
+
+    def existe(self, valor: str) -> bool:
+        return os.path.isfile(self.caminho(valor))
+
+    def remover(self, valor: str) -> None:
+        path = self.caminho(valor)
+        if os.path.exists(path):
+            os.remove(path)
+
+    def abrir(self, valor: str) -> BinaryIO:
+        return open(self.caminho(valor), "rb")
+
+    def resposta_download(self, valor: str) -> Response:
+        path = self.caminho(valor)
+        if not os.path.exists(path):
+            return JSONResponse({"error": "Arquivo ausente no disco"}, status_code=410)
+        filename = os.path.basename(path)
+        if self.x_accel_prefix and path.startswith(self.raiz + os.sep):
+            # O nginx serve o arquivo (location internal); o worker só autoriza
+            rel = os.path.relpath(path, self.raiz).replace(os.sep, "/")
+            return Response(headers={
+                "X-Accel-Redirect": f"{self.x_accel_prefix.rstrip('/')}/{quote(rel)}",
+                "Content-Type": "application/pdf",
+                "Content-Disposition": f"attachment; filename*=UTF-8''{quote(filename)}",
+            })
+        return FileResponse(path, filename=filename, media_type="application/pdf")
+
+    def upload_direto(self, chave: str) -> dict | None:
+        return None  # no disco local o upload passa pelo app
+
+
+class S3Storage:
+    """S3 ou compatível (MinIO). boto3 só é importado se este backend for usado."""
+
+    nome = "s3"
+
+    def __init__(self, bucket: str, prefixo: str = "", endpoint_url: str | None = None, expira: int = 300):
+        import boto3
+        from boto3.s3.transfer import TransferConfig
+        from botocore.config import Config
+
+        self.bucket = bucket
+        self.prefixo = prefixo.strip("/")
+        self.expira = expira
+        self.client = boto3.client(
+            "s3",
+            endpoint_url=endpoint_url,
+            config=Config(
+                signature_version="s3v4",
+                s3={"addressing_style": "path"} if endpoint_url else {},
+                max_pool_connections=32,
+            ),
+        )
+        # Upload em partes de 8 MiB: o arquivo é enviado em streaming, sem ir inteiro para a memória
+        self.transfer = TransferConfig(multipart_threshold=8 * 1024 * 1024, multipart_chunksize=8 * 1024 * 1024)
+        self._local = LocalStorage()
+
+    def _key(self, chave: str) -> str:
+        return f"{self.prefixo}/{chave}" if self.prefixo else chave
+
+    def _no_disco(self, valor: str) -> bool:
+        # Caminho antigo, ou chave gravada pelo backend local e ainda não migrada
+        return eh_caminho_legado(valor) or self._local.existe(valor)
+
+    def salvar(self, chave: str, fileobj: BinaryIO, content_type: str | None = None) -> None:
+        self.client.upload_fileobj(
+            fileobj, self.bucket, self._key(chave),
+            ExtraArgs={"ContentType": content_type or "application/pdf"},
+            Config=self.transfer,
+        )
+
+    def existe(self, valor: str) -> bool:
+        if self._no_disco(valor):
+            return self._local.existe(valor)
+        return self.existe_no_bucket(valor)
+
+    def existe_no_bucket(self, chave: str) -> bool:
+        from botocore.exceptions import ClientError
+
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self._key(chave))
+            return True
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+
+    def remover(self, valor: str) -> None:
+        if eh_caminho_legado(valor):
+            return self._local.remover(valor)
+        # Migrado sem --apagar-origem: a cópia local também sai
+        self._local.remover(valor)
+        self.client.delete_object(Bucket=self.bucket, Key=self._key(valor))
+
+    def abrir(self, valor: str) -> BinaryIO:
+        if self._no_disco(valor):
+            return self._local.abrir(valor)
+        return self.client.get_object(Bucket=self.bucket, Key=self._key(valor))["Body"]
+
+    def resposta_download(self, valor: str) -> Response:
+        if self._no_disco(valor):  # ainda não migrado
+            return self._local.resposta_download(valor)
+        filename = os.path.basename(valor)
+        url = self.client.generate_presigned_url(
+            "get_object",
+            Params={
+                "Bucket": self.bucket,
+                "Key": self._key(valor),
+                "ResponseContentType": "application/pdf",
+                "ResponseContentDisposition": f"attachment; filename*=UTF-8''{quote(filename)}",
+            },
+            ExpiresIn=self.expira,
+        )
+        return RedirectResponse(url, status_code=307)
+
+    def upload_direto(self, chave: str) -> dict | None:
+        """POST pré-assinado: o navegador envia o PDF direto para o bucket."""
+        return self.client.generate_presigned_post(
+            self.bucket,
+            self._key(chave),
+            Fields={"Content-Type": "application/pdf"},
+            Conditions=[{"Content-Type": "application/pdf"}, ["content-length-range", 1, MAX_UPLOAD_BYTES]],
+            ExpiresIn=self.expira,
+        )
+
+
+@lru_cache
+def get_storage() -> LocalStorage | S3Storage:
+    backend = os.getenv("STORAGE_BACKEND", "local")
+    if backend == "s3":
+        return S3Storage(
+            bucket=os.environ["S3_BUCKET"],
+            prefixo=os.getenv("S3_PREFIX", ""),
+            endpoint_url=os.getenv("S3_ENDPOINT_URL") or None,
+            expira=int(os.getenv("S3_PRESIGN_EXPIRES", "300")),
+        )
+    if backend != "local":
+        raise RuntimeError(f"STORAGE_BACKEND inválido: {backend!r} (use 'local' ou 's3')")
+    return LocalStorage(STORAGE_ROOT, x_accel_prefix=os.getenv("LOCAL_X_ACCEL_PREFIX") or None)
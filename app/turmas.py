@@ -1,14 +1,62 @@
 # app/turmas.py
 from fastapi import APIRouter, Form, Depends, Query
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from sqlalchemy import func, select
+from sqlalchemy import func, select, update
 
-from app.db import get_session
-from app.models import Ano, Turma
+from app.db import get_session, get_or_create, insert_ignorando_conflito
+from app.models import Ano, Turma, TurmaSequencia
 
 router = APIRouter(prefix="/turmas", tags=["Turmas"])
 
 
+# ------------------------------------------------------------------------------
+# NUMERAÇÃO (contador por ano em turma_sequencia)
+# ------------------------------------------------------------------------------
+def _garantir_sequencia(db: Session, ano_id: int) -> None:
+    # Cria o contador partindo do maior número já usado no ano (idempotente)
+    maior = select(ano_id, func.coalesce(func.max(Turma.numero), 0)).where(Turma.ano_id == ano_id)
+    db.execute(
+        insert_ignorando_conflito(db, TurmaSequencia).from_select(["ano_id", "ultimo_numero"], maior)
+    )
+
+
+def proximo_numero_turma(db: Session, ano_id: int) -> int:
+    """
+    Aloca o próximo número do ano com um UPDATE ... RETURNING: o lock da
+    linha do contador serializa criações concorrentes, e um rollback
+    devolve o número (sem buracos).
+    """
+    incrementar = (
+        update(TurmaSequencia)
+        .where(TurmaSequencia.ano_id == ano_id)
+        .values(ultimo_numero=TurmaSequencia.ultimo_numero + 1)
+        .returning(TurmaSequencia.ultimo_numero)
+    )
+    numero = db.execute(incrementar).scalar_one_or_none()
+    if numero is None:  # primeiro uso do ano
+        _garantir_sequencia(db, ano_id)
+        numero = db.execute(incrementar).scalar_one()
+    return numero
+
+
+def registrar_numero_turma(db: Session, ano_id: int, numero: int) -> None:
+    """Turma criada com número explícito: avança o contador se ficou para trás."""
+    _garantir_sequencia(db, ano_id)
+    db.execute(
+        update(TurmaSequencia)
+        .where(TurmaSequencia.ano_id == ano_id, TurmaSequencia.ultimo_numero < numero)
+        .values(ultimo_numero=numero)
+    )
+
+
+def get_or_create_turma(db: Session, numero: int, ano_id: int) -> tuple[Turma, bool]:
+    turma, created = get_or_create(db, Turma, numero=numero, ano_id=ano_id)
+    if created:
+        registrar_numero_turma(db, ano_id, numero)
+    return turma, created
+
+
 @router.get("")
 def listar_turmas(
     ano: int | None = Query(None, description="Filtra por ano (ex.: 2025)"),
@@ -26,15 +74,18 @@ def criar_turma(
     ano_valor: int = Form(..., description="Ex.: 2025"),
     db: Session = Depends(get_session),
 ):
-    ano = db.query(Ano).filter_by(valor=ano_valor).one_or_none()
-    if not ano:
-        ano = Ano(valor=ano_valor)
-        db.add(ano)
-        db.flush()
-
-    max_num = db.query(func.max(Turma.numero)).filter(Turma.ano_id == ano.id).scalar() or 0
-    nova = Turma(numero=max_num + 1, ano_id=ano.id)
-    db.add(nova)
-    db.commit()
+    # Retry só cobre a janela em que o contador nasce atrás de uma turma
+    # criada com número explícito ao mesmo tempo (ver registrar_numero_turma)
+    for tentativa in range(3):
+        try:
+            ano, _ = get_or_create(db, Ano, valor=ano_valor)
+            nova = Turma(numero=proximo_numero_turma(db, ano.id), ano_id=ano.id)
+            db.add(nova)
+            db.commit()
+            break
+        except IntegrityError:
+            db.rollback()
+            if tentativa == 2:
+                raise
     db.refresh(nova)
     return {"ok": True, "turma": {"id": nova.id, "label": nova.label}}
@@ -0,0 +1,2 @@
+# bench/__init__.py
+# Benchmarks reprodutíveis (gerador de dados sintéticos + medição dos caminhos quentes).
@@ -0,0 +1,51 @@
+# bench/comparar.py
+"""
+Compara dois resultados de `bench.run` (base -> novo).
+
+    python -m bench.comparar bench/resultados/abc123-sqlite.json bench/resultados/def456-sqlite.json
+
+Sai com código 1 se algum p50 piorar mais que --tolerancia (padrão 20%).
+"""
+import argparse
+import json
+import sys
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("base")
+    ap.add_argument("novo")
+    ap.add_argument("--tolerancia", type=float, default=0.20)
+    args = ap.parse_args(argv)
+
+    with open(args.base, encoding="utf-8") as f:
+        base = json.load(f)
+    with open(args.novo, encoding="utf-8") as f:
+        novo = json.load(f)
+
+    print(f"base: {base['meta'].get('commit')} ({base['meta']['dialeto']})  "
+          f"novo: {novo['meta'].get('commit')} ({novo['meta']['dialeto']})")
+    print(f"{'caminho':<36} {'p50 base':>10} {'p50 novo':>10} {'delta':>8} {'queries':>13}")
+
+    regressoes = []
+    for nome, r_novo in novo["resultados"].items():
+        r_base = base["resultados"].get(nome)
+        if r_base is None:
+            print(f"{nome:<36} {'—':>10} {r_novo['p50_ms']:>10.2f} {'novo':>8}")
+            continue
+        delta = (r_novo["p50_ms"] - r_base["p50_ms"]) / r_base["p50_ms"] if r_base["p50_ms"] else 0.0
+        queries = f"{r_base['queries_mean']} -> {r_novo['queries_mean']}"
+        marca = " !" if delta > args.tolerancia else ""
+        print(f"{nome:<36} {r_base['p50_ms']:>10.2f} {r_novo['p50_ms']:>10.2f} {delta:>+8.0%} {queries:>13}{marca}")
+        if marca:
+            regressoes.append(nome)
+
+    print(f"peak RSS: {base['peak_rss_kb'] / 1024:.0f} MiB -> {novo['peak_rss_kb'] / 1024:.0f} MiB")
+    if regressoes:
+        print(f"regressões acima de {args.tolerancia:.0%}: {', '.join(regressoes)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
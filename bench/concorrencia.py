@@ -0,0 +1,143 @@
+# bench/concorrencia.py
+"""
+Teste de estresse de concorrência para a numeração de turmas e os get-or-create.
+
+Dispara criações em paralelo (threads, cada uma com sua sessão/conexão):
+  - criar_turma em alguns anos, muitas vezes cada;
+  - num ano à parte, criar_turma misturado com get_or_create_turma de números
+    explícitos (a janela coberta pelo retry de criar_turma);
+  - get_or_create de Ano/Turma/DDZ com os MESMOS valores ao mesmo tempo.
+Ao final confere: nenhum erro, numeração 1..N contígua em cada ano (no ano
+misto, com todos os números explícitos presentes) e uma única linha para
+cada chave disputada. Sai com código 1 se algo falhar.
+
+    python -m bench.concorrencia                      # SQLite (WAL) temporário
+    python -m bench.concorrencia --database-url postgresql+psycopg2://user:pw@localhost/bench
+
+O banco informado é APAGADO e recriado.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import traceback
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--database-url", help="Default: SQLite em diretório temporário")
+    ap.add_argument("--turmas", type=int, default=300, help="criar_turma por ano")
+    ap.add_argument("--anos", type=int, default=3)
+    ap.add_argument("--explicitas", type=int, default=100,
+                    help="Números explícitos (cada um pedido 2x) no ano misto, junto de --turmas criar_turma")
+    ap.add_argument("--disputas", type=int, default=200, help="get-or-create concorrentes da mesma chave")
+    ap.add_argument("--threads", type=int, default=32, help="limitado na prática pelo pool (5 + 10 overflow)")
+    args = ap.parse_args(argv)
+
+    tmp = tempfile.mkdtemp(prefix="bench-concorrencia-")
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{os.path.join(tmp, 'concorrencia.db')}"
+    # Espera por lock é esperada aqui; não polui a saída com o log de SQL lenta
+    os.environ.setdefault("SLOW_QUERY_MS", "10000")
+
+    from sqlalchemy import text
+
+    from app.busca import INDICE
+    from app.db import SessionLocal, engine, get_or_create
+    from app.main import get_or_create_ano, get_or_create_turma
+    from app.models import Base, Ano, DDZ, Turma
+    from app.turmas import criar_turma
+
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP TABLE IF EXISTS {INDICE}"))
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+
+    erros: list[str] = []
+
+    def rodar(fn):
+        with SessionLocal() as db:
+            try:
+                return fn(db)
+            except Exception:
+                db.rollback()
+                erros.append(traceback.format_exc(limit=3))
+
+    anos = [2030 + i for i in range(args.anos)]
+    tarefas = [(lambda db, a=a: criar_turma(ano_valor=a, db=db)) for _ in range(args.turmas) for a in anos]
+
+    def disputar_ano_turma(db):
+        ano = get_or_create_ano(db, 2099)
+        get_or_create_turma(db, 7, ano)
+        db.commit()
+
+    def disputar_ddz(db):
+        get_or_create(db, DDZ, nome="DDZ Disputada")
+        db.commit()
+
+    # Ano misto: o contador ainda não existe quando as duas formas de criação começam
+    ano_misto = 2090
+    auto_misto: list[int] = []
+
+    def criar_auto_misto(db):
+        auto_misto.append(criar_turma(ano_valor=ano_misto, db=db)["turma"]["id"])
+
+    def criar_explicita(db, numero):
+        ano = get_or_create_ano(db, ano_misto)
+        get_or_create_turma(db, numero, ano)
+        db.commit()
+
+    misto = [criar_auto_misto] * args.turmas
+    misto += [(lambda db, n=n: criar_explicita(db, n)) for n in range(1, args.explicitas + 1)] * 2
+    tarefas += misto[::2] + misto[1::2]
+
+    tarefas += [disputar_ano_turma] * args.disputas + [disputar_ddz] * args.disputas
+    # Intercala os tipos de tarefa para maximizar a disputa
+    tarefas = tarefas[::2] + tarefas[1::2]
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        list(pool.map(rodar, tarefas))
+    dur = time.perf_counter() - t0
+
+    falhas = list(erros)
+    with SessionLocal() as db:
+        for a in anos:
+            numeros = sorted(
+                n for (n,) in db.query(Turma.numero).join(Ano).filter(Ano.valor == a)
+            )
+            if numeros != list(range(1, args.turmas + 1)):
+                faltando = sorted(set(range(1, args.turmas + 1)) - set(numeros))
+                repetidos = [n for n, c in Counter(numeros).items() if c > 1]
+                falhas.append(f"ano {a}: {len(numeros)} turmas, faltando={faltando[:10]} repetidos={repetidos[:10]}")
+        numeros = sorted(n for (n,) in db.query(Turma.numero).join(Ano).filter(Ano.valor == ano_misto))
+        if numeros != list(range(1, len(numeros) + 1)):
+            repetidos = [n for n, c in Counter(numeros).items() if c > 1]
+            falhas.append(f"ano {ano_misto}: numeração não contígua ({len(numeros)} turmas, repetidos={repetidos[:10]})")
+        if len(set(auto_misto)) != args.turmas:
+            falhas.append(f"ano {ano_misto}: {len(set(auto_misto))} de {args.turmas} criar_turma concluídos")
+        if not set(range(1, args.explicitas + 1)) <= set(numeros):
+            falhas.append(f"ano {ano_misto}: faltam números explícitos")
+        if db.query(Ano).filter_by(valor=2099).count() != 1:
+            falhas.append("Ano 2099 duplicado/ausente")
+        if db.query(Turma).join(Ano).filter(Ano.valor == 2099, Turma.numero == 7).count() != 1:
+            falhas.append("Turma 7/2099 duplicada/ausente")
+        if db.query(DDZ).filter_by(nome="DDZ Disputada").count() != 1:
+            falhas.append("DDZ disputada duplicada/ausente")
+
+    print(
+        f"{engine.dialect.name}: {len(tarefas)} operações em {dur:.1f}s "
+        f"({len(tarefas) / dur:.0f}/s, {args.threads} threads), {len(erros)} erros",
+        file=sys.stderr,
+    )
+    for f in falhas:
+        print(f"FALHA: {f}", file=sys.stderr)
+    if not falhas:
+        print("OK: sem erros, numeração contígua e sem duplicatas", file=sys.stderr)
+    return 1 if falhas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,179 @@
+# bench/gerador.py
+"""
+Gerador determinístico (por seed) de dados sintéticos.
+
+Cria DDZs, escolas, professores, anos, turmas e certificações em proporções
+parecidas com as de produção, PDFs fictícios para as certificações
+CERTIFICADO e planilhas (.csv/.xlsx) no formato esperado por /importar/excel.
+
+ATENÇÃO: `popular_banco` apaga e recria todas as tabelas do banco informado.
+"""
+import os
+import random
+import uuid
+from dataclasses import dataclass
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.busca import INDICE
+from app.models import Base, DDZ, Escola, Professor, Ano, Turma, Certificacao, StatusCert
+
+# Menor PDF válido (1 página em branco)
+PDF_FICTICIO = (
+    b"%PDF-1.4\n1 0 obj<</Type/Catalog/Pages 2 0 R>>endobj\n"
+    b"2 0 obj<</Type/Pages/Kids[3 0 R]/Count 1>>endobj\n"
+    b"3 0 obj<</Type/Page/Parent 2 0 R/MediaBox[0 0 595 842]>>endobj\n"
+    b"trailer<</Root 1 0 R>>\n%%EOF\n"
+)
+
+PRENOMES = [
+    "Ana", "João", "Maria", "José", "Antônio", "Francisca", "Márcia", "Luís", "Cláudia", "Sérgio",
+    "Patrícia", "André", "Fábio", "Lúcia", "Raimundo", "Vitória", "Inês", "Mônica", "Caio", "Tânia",
+]
+SOBRENOMES = [
+    "Silva", "Souza", "Araújo", "Conceição", "Gonçalves", "Pereira", "Brandão", "Simões", "Lima",
+    "Magalhães", "Nogueira", "Damião", "Estêvão", "Ribeiro", "Fonseca", "Calçada", "Azevedo", "Assunção",
+]
+PREFIXOS_ESCOLA = ["Escola Municipal", "Escola Estadual", "E.M.E.F.", "Centro Educacional", "Colégio"]
+
+
+@dataclass
+class Tamanho:
+    """Quantidades do dataset. Os totais derivam de `ddz` pelas proporções."""
+    ddz: int = 10
+    escolas_por_ddz: int = 10
+    professores_por_escola: int = 20
+    anos: int = 3
+    turmas_por_ano: int = 12
+    certificacoes_por_professor: float = 1.5
+    taxa_certificados: float = 0.6
+    linhas_importacao: int = 500
+
+
+def _nome_pessoa(rnd: random.Random) -> str:
+    return f"{rnd.choice(PRENOMES)} {rnd.choice(SOBRENOMES)} {rnd.choice(SOBRENOMES)}"
+
+
+def _documento(rnd: random.Random) -> str:
+    d = f"{rnd.randrange(10**11):011d}"
+    return f"{d[:3]}.{d[3:6]}.{d[6:9]}-{d[9:]}"
+
+
+def popular_banco(engine: Engine, storage_root: str, tam: Tamanho, seed: int = 42) -> dict:
+    """
+    Recria o schema e insere o dataset sintético. Retorna as contagens.
+
+    `certificado_arquivo` recebe chaves ("<professor_id>/<certificacao_id>-<uuid>.pdf")
+    relativas a `storage_root`, que deve ser o CERTS_DIR do app.
+    """
+    rnd = random.Random(seed)
+
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP TABLE IF EXISTS {INDICE}"))
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+
+    ano_base = 2025 - tam.anos + 1
+    with Session(engine) as db:
+        ddzs = [DDZ(nome=f"DDZ {i + 1:03d}") for i in range(tam.ddz)]
+        db.add_all(ddzs)
+        db.flush()
+
+        escolas = []
+        for d in ddzs:
+            for _ in range(tam.escolas_por_ddz):
+                n = len(escolas) + 1
+                escolas.append(Escola(nome=f"{rnd.choice(PREFIXOS_ESCOLA)} {_nome_pessoa(rnd)} {n:05d}", ddz_id=d.id))
+        db.add_all(escolas)
+        db.flush()
+
+        professores = []
+        for e in escolas:
+            for _ in range(tam.professores_por_escola):
+                nome = _nome_pessoa(rnd)
+                professores.append(Professor(
+                    nome=nome,
+                    documento=_documento(rnd) if rnd.random() < 0.8 else None,
+                    email=f"{nome.split()[0].lower()}.{len(professores) + 1}@escola.example" if rnd.random() < 0.6 else None,
+                    escola_id=e.id,
+                ))
+        db.add_all(professores)
+        db.flush()
+
+        anos = [Ano(valor=ano_base + i) for i in range(tam.anos)]
+        db.add_all(anos)
+        db.flush()
+
+        turmas = [Turma(numero=n + 1, ano_id=a.id) for a in anos for n in range(tam.turmas_por_ano)]
+        db.add_all(turmas)
+        db.flush()
+
+        certificacoes = []
+        for p in professores:
+            qtd = max(1, round(rnd.gauss(tam.certificacoes_por_professor, 0.5)))
+            for t in rnd.sample(turmas, min(qtd, len(turmas))):
+                c = Certificacao(professor_id=p.id, turma_id=t.id, ano_id=t.ano_id)
+                if rnd.random() < tam.taxa_certificados:
+                    c.status = StatusCert.CERTIFICADO
+                else:
+                    c.status = StatusCert.NAO_CERTIFICADO
+                certificacoes.append(c)
+        db.add_all(certificacoes)
+        db.flush()
+
+        # A chave leva o id da certificação (mesmo formato de app.storage.gerar_chave)
+        arquivos = 0
+        for c in certificacoes:
+            if c.status != StatusCert.CERTIFICADO:
+                continue
+            chave = f"{c.professor_id}/{c.id}-{uuid.UUID(int=rnd.getrandbits(128)).hex}.pdf"
+            path = os.path.join(storage_root, chave)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(PDF_FICTICIO)
+            c.certificado_arquivo = chave
+            arquivos += 1
+        db.commit()
+
+        return {
+            "ddz": len(ddzs),
+            "escola": len(escolas),
+            "professor": len(professores),
+            "ano": len(anos),
+            "turma": len(turmas),
+            "certificacao": len(certificacoes),
+            "arquivos": arquivos,
+        }
+
+
+def gerar_planilhas(destino: str, tam: Tamanho, seed: int = 42) -> dict[str, str]:
+    """
+    Gera `importacao.csv` e `importacao.xlsx` com `tam.linhas_importacao`
+    linhas: professores novos, em escolas novas ligadas às DDZs já existentes.
+    """
+    import pandas as pd
+
+    rnd = random.Random(seed + 1)
+    ano_base = 2025 - tam.anos + 1
+    linhas = []
+    qtd_escolas = max(tam.linhas_importacao // tam.professores_por_escola, 1)
+    for i in range(tam.linhas_importacao):
+        # Cada escola importada pertence sempre à mesma DDZ (existente)
+        e = rnd.randrange(qtd_escolas)
+        ano = ano_base + rnd.randrange(tam.anos)
+        linhas.append({
+            "DDZ": f"DDZ {e % tam.ddz + 1:03d}",
+            "Escola": f"Escola Importada {e + 1:04d}",
+            "Professor": f"{_nome_pessoa(rnd)} Imp{i + 1:06d}",
+            "Ano": ano,
+            "Turma": f"{rnd.randrange(tam.turmas_por_ano) + 1}/{ano}",
+        })
+
+    os.makedirs(destino, exist_ok=True)
+    df = pd.DataFrame(linhas)
+    paths = {"csv": os.path.join(destino, "importacao.csv"), "xlsx": os.path.join(destino, "importacao.xlsx")}
+    df.to_csv(paths["csv"], index=False)
+    df.to_excel(paths["xlsx"], index=False)
+    return paths
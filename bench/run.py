@@ -0,0 +1,226 @@
+# bench/run.py
+"""
+Executa os benchmarks dos caminhos quentes e grava o resultado em JSON.
+
+    python -m bench.run                                   # SQLite temporário
+    python -m bench.run --database-url postgresql+psycopg2://user:pw@localhost/bench
+    python -m bench.comparar bench/resultados/a.json bench/resultados/b.json
+
+O banco informado é APAGADO e recriado pelo gerador. Rode a partir da raiz
+do repositório (static/ e templates/ são relativos).
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+
+def _percentis(amostras: list[float]) -> dict:
+    ordenadas = sorted(amostras)
+    if len(ordenadas) > 1:
+        q = statistics.quantiles(ordenadas, n=100, method="inclusive")
+        p50, p90, p99 = q[49], q[89], q[98]
+    else:
+        p50 = p90 = p99 = ordenadas[0]
+    return {
+        "p50_ms": round(p50 * 1000, 3),
+        "p90_ms": round(p90 * 1000, 3),
+        "p99_ms": round(p99 * 1000, 3),
+        "mean_ms": round(statistics.fmean(ordenadas) * 1000, 3),
+        "max_ms": round(ordenadas[-1] * 1000, 3),
+    }
+
+
+def _queries(server_timing: str | None) -> int | None:
+    # 'db;dur=1.3;desc="4 queries", ...' -> 4
+    if not server_timing:
+        return None
+    for parte in server_timing.split(","):
+        if parte.strip().startswith("db;"):
+            desc = parte.split('desc="', 1)[-1]
+            return int(desc.split()[0])
+    return None
+
+
+def _commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--database-url", help="Default: SQLite em diretório temporário")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--ddz", type=int, default=10)
+    ap.add_argument("--escolas-por-ddz", type=int, default=10)
+    ap.add_argument("--professores-por-escola", type=int, default=20)
+    ap.add_argument("--anos", type=int, default=3)
+    ap.add_argument("--turmas-por-ano", type=int, default=12)
+    ap.add_argument("--linhas-importacao", type=int, default=500)
+    ap.add_argument("--iteracoes", type=int, default=30, help="Repetições por caminho")
+    ap.add_argument("--saida", help="Arquivo JSON (default: bench/resultados/<commit>-<dialeto>.json)")
+    args = ap.parse_args(argv)
+
+    tmp = tempfile.mkdtemp(prefix="bench-certificados-")
+    database_url = args.database_url or f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+    storage_root = os.path.join(tmp, "certificados")
+
+    # app.db / app.certificados leem o ambiente no import
+    os.environ["DATABASE_URL"] = database_url
+    os.environ["CERTS_DIR"] = storage_root
+
+    from fastapi.testclient import TestClient
+
+    from app.db import engine, SessionLocal
+    from app.main import app
+    from app.metricas import coletar
+    from app.models import Certificacao, StatusCert
+    from app.turmas import listar_turmas
+    from bench.gerador import Tamanho, PDF_FICTICIO, popular_banco, gerar_planilhas
+
+    tam = Tamanho(
+        ddz=args.ddz,
+        escolas_por_ddz=args.escolas_por_ddz,
+        professores_por_escola=args.professores_por_escola,
+        anos=args.anos,
+        turmas_por_ano=args.turmas_por_ano,
+        linhas_importacao=args.linhas_importacao,
+    )
+    rnd = random.Random(args.seed)
+
+    t0 = time.perf_counter()
+    contagens = popular_banco(engine, storage_root, tam, seed=args.seed)
+    planilhas = gerar_planilhas(os.path.join(tmp, "planilhas"), tam, seed=args.seed)
+    print(f"dataset: {contagens} em {time.perf_counter() - t0:.1f}s", file=sys.stderr)
+
+    resultados: dict[str, dict] = {}
+
+    def registrar(nome: str, amostras: list[float], queries: list[int | None], **extra):
+        qs = [q for q in queries if q is not None]
+        resultados[nome] = {
+            "n": len(amostras),
+            **_percentis(amostras),
+            "queries_mean": round(statistics.fmean(qs), 2) if qs else None,
+            **extra,
+        }
+        print(f"{nome:<36} p50={resultados[nome]['p50_ms']:>9.2f}ms  "
+              f"p99={resultados[nome]['p99_ms']:>9.2f}ms  queries={resultados[nome]['queries_mean']}",
+              file=sys.stderr)
+
+    def http(nome: str, fazer, n: int = args.iteracoes, **extra):
+        fazer()  # aquecimento
+        amostras, queries = [], []
+        for _ in range(n):
+            t = time.perf_counter()
+            r = fazer()
+            amostras.append(time.perf_counter() - t)
+            assert r.status_code < 400, (nome, r.status_code, r.text[:200])
+            queries.append(_queries(r.headers.get("server-timing")))
+        registrar(nome, amostras, queries, **extra)
+
+    with TestClient(app) as c:
+        # Importação: a 1ª carga insere tudo; as seguintes só encontram registros existentes
+        with open(planilhas["xlsx"], "rb") as f:
+            xlsx = f.read()
+        with open(planilhas["csv"], "rb") as f:
+            csv = f.read()
+        t = time.perf_counter()
+        r = c.post("/importar/excel", files={"file": ("importacao.xlsx", xlsx)})
+        dur = time.perf_counter() - t
+        assert r.json().get("ok"), r.text[:200]
+        registrar(
+            "importar_excel_xlsx_carga", [dur], [_queries(r.headers.get("server-timing"))],
+            linhas_por_segundo=round(tam.linhas_importacao / dur, 1),
+        )
+        http(
+            "importar_excel_csv_reimportacao",
+            lambda: c.post("/importar/excel", files={"file": ("importacao.csv", csv)}),
+            n=max(args.iteracoes // 10, 3),
+        )
+
+        http("api_visao_geral", lambda: c.get("/api/visao-geral"))
+        http("api_visao_geral_turma", lambda: c.get("/api/visao-geral", params={"turma": "1/2025"}))
+        http("api_visao_geral_certificados", lambda: c.get("/api/visao-geral", params={"only_certificados": 1}))
+
+        for nome, url in [
+            ("page_ddz", "/ddz"),
+            ("page_escolas", "/escolas"),
+            ("page_professores", "/professores"),
+            ("page_anos", "/anos"),
+            ("page_turmas", "/turmas"),
+            ("page_certificados", "/certificados"),
+            ("page_certificados_nao", "/certificados?view=nao"),
+            ("page_importar", "/importar"),
+        ]:
+            http(nome, lambda url=url: c.get(url))
+
+        with SessionLocal() as db:
+            certificados = [
+                i for (i,) in db.query(Certificacao.id).filter(Certificacao.status == StatusCert.CERTIFICADO)
+            ]
+            nao = [
+                i for (i,) in db.query(Certificacao.id).filter(Certificacao.status == StatusCert.NAO_CERTIFICADO)
+            ]
+        http("download_certificado", lambda: c.get(f"/certificados/{rnd.choice(certificados)}/download"))
+        http(
+            "upload_certificado",
+            lambda: c.post(
+                "/certificados/upload",
+                data={"certificacao_id": str(rnd.choice(nao))},
+                files={"file": ("cert.pdf", PDF_FICTICIO, "application/pdf")},
+            ),
+        )
+
+    # GET /turmas é atendido pela página HTML (registrada antes do router),
+    # então listar_turmas é medido chamando o handler direto
+    amostras, queries = [], []
+    for i in range(args.iteracoes + 1):
+        with SessionLocal() as db, coletar() as tempos:
+            t = time.perf_counter()
+            listar_turmas(ano=None, db=db)
+            dur = time.perf_counter() - t
+        if i:
+            amostras.append(dur)
+            queries.append(tempos.sql_count)
+    registrar("listar_turmas", amostras, queries)
+
+    saida = {
+        "meta": {
+            "commit": _commit(),
+            "quando": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "dialeto": engine.dialect.name,
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+            "seed": args.seed,
+            "iteracoes": args.iteracoes,
+            "tamanho": vars(tam),
+            "contagens": contagens,
+        },
+        # ru_maxrss: KiB no Linux, bytes no macOS
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // (1024 if sys.platform == "darwin" else 1),
+        "resultados": resultados,
+    }
+    destino = args.saida or os.path.join(
+        "bench", "resultados", f"{saida['meta']['commit'] or 'local'}-{engine.dialect.name}.json"
+    )
+    os.makedirs(os.path.dirname(destino) or ".", exist_ok=True)
+    with open(destino, "w", encoding="utf-8") as f:
+        json.dump(saida, f, ensure_ascii=False, indent=2)
+    print(f"resultado: {destino} (peak RSS {saida['peak_rss_kb'] / 1024:.0f} MiB)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
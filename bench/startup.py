@@ -0,0 +1,108 @@
+# bench/startup.py
+"""
+Mede o cold start de um worker: tempo de `import app.main` + handlers de
+startup e o RSS de pico, cada amostra em um processo Python novo.
+
+    python -m bench.startup --iteracoes 10
+
+Cenários:
+  dev          APP_ENV=dev (create_all no boot), pandas sob demanda
+  production   APP_ENV=production (só confere o head do Alembic)
+  eager_pandas production + `import pandas` antes do app (como era antes)
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timezone
+
+from bench.run import _commit, _percentis
+
+FILHO = r"""
+import json, resource, sys, time
+t0 = time.perf_counter()
+if {eager!r}:
+    import pandas
+import app.main
+t1 = time.perf_counter()
+for handler in app.main.app.router.on_startup:
+    handler()
+t2 = time.perf_counter()
+print(json.dumps({{
+    "import_s": t1 - t0,
+    "startup_s": t2 - t1,
+    "total_s": t2 - t0,
+    "rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    "pandas_carregado": "pandas" in sys.modules,
+}}))
+"""
+
+CENARIOS = {
+    "dev": {"APP_ENV": "dev", "eager": False},
+    "production": {"APP_ENV": "production", "eager": False},
+    "eager_pandas": {"APP_ENV": "production", "eager": True},
+}
+
+
+def _amostra(cenario: dict, database_url: str) -> dict:
+    env = dict(os.environ, DATABASE_URL=database_url, APP_ENV=cenario["APP_ENV"])
+    out = subprocess.run(
+        [sys.executable, "-c", FILHO.format(eager=cenario["eager"])],
+        env=env, capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--iteracoes", type=int, default=10)
+    ap.add_argument("--saida", help="Default: bench/resultados/startup-<commit>.json")
+    args = ap.parse_args(argv)
+
+    # Banco já no head, para o cenário production conseguir subir
+    tmp = tempfile.mkdtemp(prefix="bench-startup-")
+    database_url = f"sqlite:///{os.path.join(tmp, 'startup.db')}"
+    subprocess.run(
+        [sys.executable, "-m", "alembic", "upgrade", "head"],
+        env=dict(os.environ, DATABASE_URL=database_url), capture_output=True, check=True,
+    )
+
+    resultados = {}
+    for nome, cenario in CENARIOS.items():
+        _amostra(cenario, database_url)  # aquecimento (cache de .pyc / disco)
+        amostras = [_amostra(cenario, database_url) for _ in range(args.iteracoes)]
+        resultados[nome] = {
+            "n": len(amostras),
+            "import": _percentis([a["import_s"] for a in amostras]),
+            "startup": _percentis([a["startup_s"] for a in amostras]),
+            "total": _percentis([a["total_s"] for a in amostras]),
+            "rss_kb_mediana": int(statistics.median(a["rss_kb"] for a in amostras)),
+            "pandas_carregado": amostras[0]["pandas_carregado"],
+        }
+        r = resultados[nome]
+        print(f"{nome:<14} total p50={r['total']['p50_ms']:>8.1f}ms  "
+              f"startup p50={r['startup']['p50_ms']:>7.1f}ms  RSS={r['rss_kb_mediana'] / 1024:>6.1f} MiB",
+              file=sys.stderr)
+
+    saida = {
+        "meta": {
+            "commit": _commit(),
+            "quando": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": sys.version.split()[0],
+            "iteracoes": args.iteracoes,
+        },
+        "resultados": resultados,
+    }
+    destino = args.saida or os.path.join("bench", "resultados", f"startup-{saida['meta']['commit'] or 'local'}.json")
+    os.makedirs(os.path.dirname(destino) or ".", exist_ok=True)
+    with open(destino, "w", encoding="utf-8") as f:
+        json.dump(saida, f, ensure_ascii=False, indent=2)
+    print(f"resultado: {destino}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())